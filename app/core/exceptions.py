@@ -0,0 +1,2 @@
+class FilteringError(Exception):
+    """Invalid filter, projection or relationship path in a repository query; reported as a 400."""
@@ -0,0 +1,84 @@
+"""
+Prometheus metrics of the application.
+
+Set `PROMETHEUS_MULTIPROC_DIR` to a directory shared by all worker processes (and emptied on deploy)
+to aggregate the metrics of every worker in `/metrics`. Gauges use the `livesum` multiprocess mode so
+that values of all live worker processes are summed; the values of an exited worker are dropped by
+the `child_exit` hook of gunicorn.conf.py, so multiple workers must be run by gunicorn (not
+`uvicorn --workers`) for gauges such as `db_pool_checked_out` to stay correct across worker restarts.
+"""
+import os
+import time
+from functools import wraps
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured size of the database connection pool", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Database connections currently checked out", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Database connections open beyond the pool size", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a database connection from the pool", ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being processed", multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Repository call latency", ["model", "method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REDIS_DURATION = Histogram(
+    "redis_command_duration_seconds", "Redis command latency", ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+AMQP_PUBLISHED = Counter("amqp_messages_published_total", "Messages published to RabbitMQ")
+AMQP_CONSUMED = Counter("amqp_messages_consumed_total", "Messages consumed from RabbitMQ")
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections", "Open WebSocket connections", multiprocess_mode="livesum"
+)
+WEBSOCKET_REAPED = Counter("websocket_reaped_total", "WebSocket connections reaped by the heartbeat")
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds", "Time a password hash/verify waited for a free worker", ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds", "Duration of a password hash/verify", ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+def observe_repository(method):
+    """Records the duration of a repository method by model and method name."""
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            DB_QUERY_DURATION.labels(self.model.__name__, method.__name__).observe(time.perf_counter() - start)
+    return wrapper
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Exposes the metrics of this process, or of all workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
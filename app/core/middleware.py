@@ -1,58 +1,88 @@
+import time
 import traceback
 
 import sentry_sdk
-from fastapi import Request
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.exceptions import FilteringError
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from app.database.unit_of_work import UnitOfWork, reset_unit_of_work, set_unit_of_work
 from loggers import get_logger
 
 logger = get_logger(__name__)
 
 
-class ValidationErrorMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        try:
-            response = await call_next(request)
-            return response
-        except ValidationError as e:
-            logger.error("Validation error at %s: %s", request.url.path, e.errors())
-            sentry_sdk.capture_exception(e)
-            return JSONResponse(
-                status_code=422,
-                content={"detail": e.errors()}
-            )
+class ErrorHandlingMiddleware:
+    """
+    Pure ASGI middleware translating unhandled errors into JSON responses.
+
+    Replaces the ValidationError, database and unexpected error `BaseHTTPMiddleware` layers with a
+    single layer that adds no task or memory stream per request and leaves streaming responses intact.
+    Errors raised after the response has started are re-raised.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        response_started = False
 
-class DatabaseErrorMiddleware(BaseHTTPMiddleware):
-    """Middleware for handling database errors"""
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
-            return response
-        except IntegrityError as e:
-            logger.error(f"Integrity error at {request.url.path}: {str(e.orig)}")
-            sentry_sdk.capture_exception(e)
-            return self.handle_postgresql_error(e)
-
-        except OperationalError as e:
-            logger.error(f"Database connection error at {request.url.path}: {str(e.orig)}")
-            sentry_sdk.capture_exception(e)
-            return JSONResponse(
-                status_code=400,
-                content={"detail": "Database connection error. Please try again later."}
-            )
-
-        except ProgrammingError as e:
-            logger.error(f"SQL syntax error at {request.url.path}: {str(e.orig)}")
-            sentry_sdk.capture_exception(e)
-            return JSONResponse(
-                status_code=400,
-                content={"detail": "Database query error. Please check your request."}
-            )
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_started:
+                raise
+            response = self.handle_exception(e, scope["path"])
+            await response(scope, receive, send)
+
+    def handle_exception(self, error: Exception, path: str) -> JSONResponse:
+        """Maps an exception to the error response"""
+        if isinstance(error, ValidationError):
+            logger.error("Validation error at %s: %s", path, error.errors())
+            sentry_sdk.capture_exception(error)
+            return self.response(422, error.errors())
+
+        if isinstance(error, FilteringError):
+            logger.warning("Filtering error at %s: %s", path, error)
+            return self.response(400, str(error))
+
+        if isinstance(error, IntegrityError):
+            logger.error(f"Integrity error at {path}: {str(error.orig)}")
+            sentry_sdk.capture_exception(error)
+            return self.handle_postgresql_error(error)
+
+        if isinstance(error, OperationalError):
+            logger.error(f"Database connection error at {path}: {str(error.orig)}")
+            sentry_sdk.capture_exception(error)
+            return self.response(400, "Database connection error. Please try again later.")
+
+        if isinstance(error, ProgrammingError):
+            logger.error(f"SQL syntax error at {path}: {str(error.orig)}")
+            sentry_sdk.capture_exception(error)
+            return self.response(400, "Database query error. Please check your request.")
+
+        error_traceback = "".join(traceback.format_exception(error))  # getting full stacktrace
+        logger.error(
+            "Unexpected error at %s: %s\n%s",
+            path,
+            str(error),
+            error_traceback,
+        )
+        sentry_sdk.capture_exception(error)
+        return self.response(400, "Unexpected error")
 
     def handle_postgresql_error(self, error):
         """PostgreSQL error handling (asyncpg)"""
@@ -86,28 +116,87 @@ class DatabaseErrorMiddleware(BaseHTTPMiddleware):
 
         return self.response(400, detail_message)
 
-    def response(self, status_code: int, message: str):
+    def response(self, status_code: int, message):
         """Creates a JSON response for the given status code and message"""
         return JSONResponse(status_code=status_code, content={"detail": message})
 
 
-class UnexpectedErrorMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class UnitOfWorkMiddleware:
+    """
+    Pure ASGI middleware running every HTTP request in a unit of work.
+
+    The transaction is committed right before a successful (< 400) response starts, so commit errors
+    still reach the error handling middleware, and rolled back for error responses and exceptions.
+    The unit of work is then closed, so writes made after the response starts (background tasks,
+    streaming bodies) run in their own sessions and are committed on their own.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        uow = UnitOfWork()
+        token = set_unit_of_work(uow)
+        finished = False
+
+        async def send_wrapper(message: Message):
+            nonlocal finished
+            if message["type"] == "http.response.start" and not finished:
+                finished = True
+                try:
+                    if message["status"] < 400:
+                        await uow.commit()
+                    else:
+                        await uow.rollback()
+                finally:
+                    await uow.close()
+            await send(message)
+
         try:
-            return await call_next(request)
-        except Exception as e:
-            error_traceback = traceback.format_exc()  # getting full stacktrace
-            logger.error(
-                "Unexpected error at %s: %s\n%s",
-                request.url.path,
-                str(e),
-                error_traceback,
-            )
-
-            sentry_sdk.capture_exception(e)
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "detail": "Unexpected error",
-                }
-            )
\ No newline at end of file
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            await uow.rollback()
+            raise
+        finally:
+            await uow.close()
+            reset_unit_of_work(token)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route template and the in-flight gauge.
+
+    Unmatched paths are grouped under a single label to keep the label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), status_code
+            ).observe(time.perf_counter() - start)
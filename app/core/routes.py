@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 
-from app.user.auth.routers import router as user_auth_router
+from app.users.auth.routers import router as user_auth_router
 
 v1 = APIRouter()
 
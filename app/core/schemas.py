@@ -1,9 +1,11 @@
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar
 
-from pydantic import BaseModel, Extra
+from pydantic import BaseModel, Extra, Field
 
 from .enums import OrderBy
 
+T = TypeVar("T")
+
 
 class Base(BaseModel):
     class Config:
@@ -17,5 +19,15 @@ class ItemQueryParams(Base):
     asc: bool = False
 
 
+class CursorQueryParams(ItemQueryParams):
+    cursor: Optional[str] = None
+    limit: int = Field(default=50, ge=1, le=500)
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
 class FireBaseIDSchema(BaseModel):
     firebase_id: str
\ No newline at end of file
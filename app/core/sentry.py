@@ -0,0 +1,68 @@
+import random
+from datetime import datetime
+from typing import Optional
+
+import sentry_sdk
+
+from app.core.settings import settings
+
+
+def route_sample_rate(path: str) -> float:
+    """Sample rate of the longest matching `sentry_route_sample_rates` prefix, or the default rate."""
+    if any(path == route or path.startswith(route + "/") for route in settings.sentry_ignored_routes):
+        return 0.0
+    matches = [route for route in settings.sentry_route_sample_rates if path.startswith(route)]
+    if not matches:
+        return settings.sentry_traces_sample_rate
+    return settings.sentry_route_sample_rates[max(matches, key=len)]
+
+
+def traces_sampler(sampling_context: dict) -> float:
+    """Head sampling: follows the parent decision, otherwise samples per route; health and metrics are dropped."""
+    parent_sampled = sampling_context.get("parent_sampled")
+    if parent_sampled is not None:
+        return float(parent_sampled)
+    scope = sampling_context.get("asgi_scope") or {}
+    return route_sample_rate(scope.get("path", ""))
+
+
+def _seconds(value) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def before_send_transaction(event: dict, hint: dict) -> Optional[dict]:
+    """
+    Tail filter of the sampled transactions: errored and slow ones are always kept, the others
+    only with `sentry_fast_transaction_keep_rate`, which raises the share of errors and slow requests.
+    """
+    trace = event.get("contexts", {}).get("trace", {})
+    if trace.get("status") not in (None, "ok"):
+        return event
+
+    start, end = _seconds(event.get("start_timestamp")), _seconds(event.get("timestamp"))
+    if start is not None and end is not None and (end - start) * 1000 >= settings.sentry_slow_request_ms:
+        return event
+
+    if random.random() < settings.sentry_fast_transaction_keep_rate:
+        return event
+    return None
+
+
+def init_sentry() -> None:
+    """Initializes Sentry with the sampling and profiling configured in settings."""
+    experiments = {}
+    if settings.sentry_profiling_enabled:
+        # Continuous profiling is only started where explicitly enabled
+        experiments["continuous_profiling_auto_start"] = True
+    sentry_sdk.init(
+        dsn=settings.sentry_dsn,
+        environment=settings.sentry_environment,
+        sample_rate=settings.sentry_error_sample_rate,
+        traces_sampler=traces_sampler,
+        before_send_transaction=before_send_transaction,
+        _experiments=experiments,
+    )
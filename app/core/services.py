@@ -1,6 +1,8 @@
 from typing import Sequence, Optional, TypeVar
 from pydantic import BaseModel
 
+from app.core.schemas import CursorPage, CursorQueryParams
+
 T = TypeVar("T")
 R = TypeVar("R", bound=BaseModel)
 
@@ -20,8 +22,29 @@ class BaseService:
     async def get_list(self, **filters) -> Sequence[T]:
         return await self.repository.get_list(**filters)
 
+    async def get_page(self, params: CursorQueryParams, **filters) -> CursorPage:
+        items, next_cursor = await self.repository.get_page(
+            params.order_by, params.asc, params.cursor, params.limit, **filters
+        )
+        return CursorPage(items=list(items), next_cursor=next_cursor)
+
     async def update(self, data: R, **filters) -> Optional[T]:
         return await self.repository.update(data.model_dump(exclude_unset=True), **filters)
 
     async def delete(self, **filters) -> Optional[T]:
-        return await self.repository.delete(**filters)
\ No newline at end of file
+        return await self.repository.delete(**filters)
+
+    async def bulk_create(self, data: Sequence[R], chunk_size: Optional[int] = None) -> int:
+        return await self.repository.bulk_create([item.model_dump() for item in data], chunk_size=chunk_size)
+
+    async def bulk_upsert(
+            self, data: Sequence[R], index_elements: Sequence[str], chunk_size: Optional[int] = None
+    ) -> int:
+        return await self.repository.bulk_upsert(
+            [item.model_dump() for item in data], index_elements=index_elements, chunk_size=chunk_size
+        )
+
+    async def bulk_update(self, data: Sequence[R], chunk_size: Optional[int] = None) -> int:
+        return await self.repository.bulk_update(
+            [item.model_dump(exclude_unset=True) for item in data], chunk_size=chunk_size
+        )
\ No newline at end of file
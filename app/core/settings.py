@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings
 from sqlalchemy import URL
 from pytz import timezone
@@ -6,6 +8,14 @@ from pytz import timezone
 class Settings(BaseSettings):
     timezone: str = "Asia/Tashkent"
     sentry_dsn: str
+    sentry_environment: Optional[str] = None
+    sentry_traces_sample_rate: float = 0.2
+    sentry_route_sample_rates: Dict[str, float] = {}  # path prefix -> rate, JSON in env
+    sentry_ignored_routes: List[str] = ["/metrics", "/health", "/api/v1/health"]
+    sentry_slow_request_ms: int = 1000
+    sentry_fast_transaction_keep_rate: float = 0.25
+    sentry_error_sample_rate: float = 1.0
+    sentry_profiling_enabled: bool = False
     db_echo: bool
     project_name: str
     version: str
@@ -17,29 +27,68 @@ class Settings(BaseSettings):
     postgres_host: str
     postgres_port: int
     postgres_db: str
+    postgres_replica_hosts: str = ""  # comma-separated host[:port] list of read replicas
+    db_read_your_writes_seconds: float = 5.0
+    db_replica_retry_after: int = 30
+    db_max_connections: int = 30  # connection budget of the whole app per database, split between workers
+    web_concurrency: int = 1  # number of worker processes (WEB_CONCURRENCY)
+    db_pool_size: Optional[int] = None  # overrides the size derived from db_max_connections
+    db_max_overflow: Optional[int] = None
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 60 * 30
+    db_pool_pre_ping: bool = False
+    db_pgbouncer: bool = False  # disables prepared statement caching for pgbouncer transaction pooling
+    db_bulk_chunk_size: int = 1000
+    db_copy_threshold: int = 10000
 
     jwt_user_secret_key: str
     jwt_superuser_secret_key: str
     jwt_business_user_secret_key: str
     algorithm: str
+    jwt_user_private_key: Optional[str] = None  # PEM, required for ES256/EdDSA/RS256 signing
+    jwt_user_public_key: Optional[str] = None  # PEM, enough to verify tokens at the edge
+    jwt_verified_cache_size: int = 10000
+    jwt_verified_cache_ttl: int = 60
     access_token_expire_minutes: int
     refresh_token_expire_minutes: int
 
+    password_hash_concurrency: Optional[int] = None  # derived from available memory when not set
+
     redis_host: str
     redis_port: int
     redis_password: str
     redis_database: int = 0
 
+    user_cache_ttl: int = 300
+    user_cache_local_ttl: int = 5
+    user_cache_size: int = 10000
+
     rabbitmq_host: str
     rabbitmq_port: int
     rabbitmq_user: str
     rabbitmq_password: str
+    rabbitmq_max_connections: int = 2
 
     bucket_name: str
     aws_access_key_id: str
     aws_secret_access_key: str
     region_name: str
     s3_sample_url: str
+    s3_endpoint_url: Optional[str] = None  # e.g. MinIO or a local moto server
+    s3_max_pool_connections: int = 50
+    s3_connect_timeout: float = 5
+    s3_read_timeout: float = 60
+    s3_dedup_enabled: bool = True  # skip uploads whose content-addressed key is already stored
+    s3_object_index_ttl: int = 7 * 24 * 60 * 60
+    s3_multipart_threshold: int = 8 * 1024 * 1024  # smaller uploads go through a single put_object
+    s3_part_size: int = 8 * 1024 * 1024  # S3 requires at least 5 MB for all but the last part
+    s3_upload_concurrency: int = 4  # parts in flight (and in memory) per upload
+
+    ws_history_max_len: int = 1000
+    ws_history_ttl: int = 300
+    ws_send_queue_size: int = 256
+    ws_send_batch_size: int = 50
+    ws_overflow_policy: str = "drop_oldest"
 
     ping_interval: int
     connection_ttl: int
@@ -71,6 +120,33 @@ class Settings(BaseSettings):
             database=self.postgres_db,
         )
 
+    def build_db_pool_options(self) -> dict:
+        """Pool options of each worker: `db_max_connections` split between `web_concurrency` workers."""
+        budget = max(2, self.db_max_connections // max(1, self.web_concurrency))
+        pool_size = self.db_pool_size if self.db_pool_size is not None else max(1, budget // 2)
+        max_overflow = self.db_max_overflow if self.db_max_overflow is not None else max(0, budget - pool_size)
+        return {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+        }
+
+    def build_postgres_replica_dsns_async(self) -> List[URL]:
+        dsns = []
+        for replica in filter(None, map(str.strip, self.postgres_replica_hosts.split(","))):
+            host, _, port = replica.partition(":")
+            dsns.append(URL.create(
+                "postgresql+asyncpg",
+                username=self.postgres_user,
+                password=self.postgres_password,
+                host=host,
+                port=int(port) if port else self.postgres_port,
+                database=self.postgres_db,
+            ))
+        return dsns
+
     def build_postgres_dsn_sync(self) -> URL:
         return URL.create(
             "postgresql",
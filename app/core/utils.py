@@ -1,22 +1,53 @@
+import asyncio
 import json
+import os
 import random
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, time
-from typing import Optional, Tuple, Union
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar, Union
 from zoneinfo import ZoneInfo
 
 import pytz
 from passlib.context import CryptContext
 
+from app.core.metrics import PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_SECONDS
 from app.core.settings import settings
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+ARGON2_MEMORY_COST = 65536  # KiB, 64 MB
 
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
-    argon2__memory_cost=65536,  # 64 MB
+    argon2__memory_cost=ARGON2_MEMORY_COST,
     argon2__time_cost=3,
     argon2__parallelism=2
 )
 
+R = TypeVar("R")
+
+
+def _password_hash_concurrency() -> int:
+    """
+    Number of concurrent Argon2 computations: `password_hash_concurrency`, or as many as fit
+    in half of the available memory, capped by the CPU count.
+    """
+    if settings.password_hash_concurrency:
+        return settings.password_hash_concurrency
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 2
+    return max(1, min(os.cpu_count() or 1, available // 2 // (ARGON2_MEMORY_COST * 1024)))
+
+
+# argon2 releases the GIL, so a bounded thread pool runs hashes in parallel off the event loop
+# while capping the memory used by concurrent calls
+password_executor = ThreadPoolExecutor(max_workers=_password_hash_concurrency(), thread_name_prefix="argon2")
+
 
 def hash_password(password: str) -> str:
     """
@@ -42,6 +73,80 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+async def _run_password_task(operation: str, func: Callable[..., R], *args) -> R:
+    submitted_at = timer.perf_counter()
+
+    def task():
+        started_at = timer.perf_counter()
+        PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(started_at - submitted_at)
+        try:
+            return func(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.labels(operation).observe(timer.perf_counter() - started_at)
+
+    return await asyncio.get_running_loop().run_in_executor(password_executor, task)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes the password like `hash_password` on the bounded password pool, without blocking the event loop.
+
+    :param password: The plaintext password as a string.
+    :return: The hashed password as a string.
+    """
+    return await _run_password_task("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies the password like `verify_password` on the bounded password pool.
+
+    :param plain_password: The text password provided by the users.
+    :param hashed_password: The stored hashed password from the database.
+    :return: True if the passwords match, False otherwise.
+    """
+    return await _run_password_task("verify", verify_password, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies the password and rehashes it when the stored hash uses outdated Argon2 parameters.
+
+    :return: (matches, new hash to store or None).
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except ValueError:
+        return False, None
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Async `verify_and_update_password` on the bounded password pool; see `verify_password_and_rehash`."""
+    return await _run_password_task("verify", verify_and_update_password, plain_password, hashed_password)
+
+
+async def verify_password_and_rehash(
+        plain_password: str, hashed_password: str, save_hash: Callable[[str], Awaitable[None]],
+) -> bool:
+    """
+    Verifies the password on the bounded password pool and, when the stored hash uses outdated
+    Argon2 parameters, stores the new hash with `save_hash`, e.g.
+    `lambda new_hash: service.update({"password": new_hash}, id=user.id)`.
+
+    A failing `save_hash` is logged and does not fail the verification; the rehash is retried
+    on the next successful login.
+
+    :return: True if the password matches, False otherwise.
+    """
+    matches, new_hash = await verify_and_update_password_async(plain_password, hashed_password)
+    if matches and new_hash is not None:
+        try:
+            await save_hash(new_hash)
+        except Exception as e:
+            logger.warning("Storing the rehashed password failed: %s", e)
+    return matches
+
+
 async def generate_otp() -> str:
     """
     Generate a random OTP
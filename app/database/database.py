@@ -1,19 +1,36 @@
+import uuid
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.database.mixins import Base
+from app.database.pool import InstrumentedQueuePool
 from app.core.settings import settings
 
 DATABASE_URL = settings.build_postgres_dsn_async()
 
-engine = create_async_engine(DATABASE_URL,
-                             echo=settings.db_echo,
-                             pool_size=15,
-                             max_overflow=15,
-                             pool_timeout=30,
-                             pool_recycle=60 * 30,  # Restart the pool after 30 minutes
-                             )
+ENGINE_OPTIONS = dict(
+    echo=settings.db_echo,
+    poolclass=InstrumentedQueuePool,
+    **settings.build_db_pool_options(),
+)
+
+if settings.db_pgbouncer:
+    # pgbouncer in transaction mode does not support prepared statements across transactions
+    ENGINE_OPTIONS["connect_args"] = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+engine = create_async_engine(DATABASE_URL, pool_logging_name="primary", **ENGINE_OPTIONS)
+
+# Optional read replicas, see app.database.routing
+replica_engines = [
+    create_async_engine(url, pool_logging_name=f"replica_{index}", **ENGINE_OPTIONS)
+    for index, url in enumerate(settings.build_postgres_replica_dsns_async())
+]
 
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)  # noqa
 
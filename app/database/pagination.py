@@ -0,0 +1,45 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Tuple
+
+from fastapi import HTTPException, status
+
+invalid_cursor_exception = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
+
+
+def encode_cursor(value: Any, key: Any) -> str:
+    """Builds an opaque cursor from the (order_by value, primary key) of the last item of a page."""
+    raw = json.dumps([_dump(value), _dump(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, value_type: type, key_type: type) -> Tuple[Any, Any]:
+    """Parses a cursor built by `encode_cursor` back into typed (value, key)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, key = json.loads(raw)
+        return _load(value_type, value), _load(key_type, key)
+    except (ValueError, TypeError):
+        raise invalid_cursor_exception
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(python_type: type, value: Any) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return value
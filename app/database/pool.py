@@ -0,0 +1,33 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_SIZE, DB_POOL_WAIT_SECONDS
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool exporting its state to Prometheus: connections checked out, overflow
+    and the time spent waiting for a connection. The engine label is the pool logging name.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics_label = self._orig_logging_name or "primary"
+        DB_POOL_SIZE.labels(self.metrics_label).set(self.size())
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(self.metrics_label).observe(time.perf_counter() - start)
+            self._report()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._report()
+
+    def _report(self):
+        DB_POOL_CHECKED_OUT.labels(self.metrics_label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self.metrics_label).set(max(self.overflow(), 0))
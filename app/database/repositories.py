@@ -1,9 +1,20 @@
-from typing import Sequence, Type, TypeVar, Optional
+import enum
+from functools import partial
+from typing import Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
 
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import delete, insert, inspect, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import UpdateBase
 
+from app.core.metrics import observe_repository
+from app.core.settings import settings
+from app.database.filters import build_filters, build_load_options, build_projection
+from app.database.pagination import decode_cursor, encode_cursor
 from app.database.database import async_session
+from app.database.routing import REPLICA_ERRORS, read_replica, replica_router
+from app.database.unit_of_work import commit, get_unit_of_work, run_after_commit, session_scope, write_scope
 from loggers import get_logger
 
 logger = get_logger(__name__)
@@ -11,103 +22,353 @@ logger = get_logger(__name__)
 T = TypeVar("T")
 
 
+def chunked(rows: Sequence[dict], size: int) -> Iterator[Sequence[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
 class SQLAlchemyRepository:
-    """Base repository with common SQLAlchemy operations using context-managed sessions."""
+    """
+    Base repository with common SQLAlchemy operations using context-managed sessions.
+
+    Inside a request the repositories join the request unit of work (see `app.database.unit_of_work`),
+    outside of one every call runs in its own session and transaction. The duration of every public
+    method is recorded per model and method (subclasses delegating to `super()` need no decorator).
+    """
+
+    # Single-statement UPDATE/DELETE ... RETURNING writes; set to False for the SELECT-then-write path
+    returning_writes: bool = True
 
     def __init__(self, model: Type[T]):
         self.model = model
+        mapper = inspect(model)
+        self.primary_key = getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
 
+    @observe_repository
     async def create(self, data: dict) -> Optional[T]:
         """Create a new record with context-managed session and error handling."""
-        async with async_session() as session:
+        async with write_scope() as session:
             instance = self.model(**data)
             session.add(instance)
-            await session.commit()
+            await commit(session)
             await session.refresh(instance)
             logger.info("%s created successfully.", self.model.__name__)
             return instance
 
-    async def get_single(self, **filters) -> Optional[T]:
+    def _select(
+            self, filters: dict, only: Optional[Sequence[str]] = None,
+            load: Optional[Sequence[str]] = None, load_strategy: str = "selectin",
+    ):
+        """
+        Builds a SELECT of the model with `build_filters` conditions.
+
+        `only` limits the loaded columns; the other attributes of the returned records are deferred
+        and must not be accessed once the session is closed. `load` eagerly loads the given
+        relationships with the `selectin` or `joined` strategy, so they are usable after the
+        session is closed without one query per row.
+        """
+        return select(self.model).where(*build_filters(self.model, filters)).options(
+            *build_projection(self.model, only),
+            *build_load_options(self.model, load, load_strategy),
+        )
+
+    async def _read(self, query, primary: bool = False) -> Result:
+        """
+        Executes a read query on a read replica when one is available, otherwise on the primary.
+
+        Reads stay on the primary when `primary` is set (e.g. authentication, which must not see
+        a lagging replica), inside a unit of work that already holds a session (it may contain
+        uncommitted writes) and for `db_read_your_writes_seconds` after a write in the same
+        context. A failing replica is marked down and the query is retried on the primary.
+        """
+        uow = get_unit_of_work()
+        replica = None if primary or (uow is not None and uow.has_session) else read_replica()
+        if replica is not None:
+            try:
+                async with async_session(bind=replica) as session:
+                    return await session.execute(query)
+            except REPLICA_ERRORS as e:
+                logger.error("Read replica query failed: %s", e)
+                replica_router.mark_down(replica)
+        async with session_scope() as session:
+            return await session.execute(query)
+
+    @observe_repository
+    async def get_single(
+            self, only: Optional[Sequence[str]] = None, load: Optional[Sequence[str]] = None,
+            load_strategy: str = "selectin", primary: bool = False, **filters
+    ) -> Optional[T]:
         """Retrieve a single record with context-managed session and error handling."""
-        async with async_session() as session:
-            query = select(self.model).filter_by(**filters)
-            result = await session.execute(query)
-            return result.scalars().first()
+        query = self._select(filters, only, load, load_strategy)
+        result = await self._read(query, primary)
+        return result.unique().scalars().first()
 
-    async def get_list(self, **filters) -> Sequence[T]:
+    @observe_repository
+    async def get_list(
+            self, only: Optional[Sequence[str]] = None, load: Optional[Sequence[str]] = None,
+            load_strategy: str = "selectin", primary: bool = False, **filters
+    ) -> Sequence[T]:
         """Retrieve a list of records with context-managed session and error handling."""
-        async with async_session() as session:
-            query = select(self.model).filter_by(**filters)
-            result = await session.execute(query)
-            return result.scalars().all()
+        query = self._select(filters, only, load, load_strategy)
+        result = await self._read(query, primary)
+        return result.unique().scalars().all()
+
+    @observe_repository
+    async def get_page(
+            self, order_by: str, asc: bool = False, cursor: Optional[str] = None, limit: int = 50,
+            only: Optional[Sequence[str]] = None, load: Optional[Sequence[str]] = None,
+            load_strategy: str = "selectin", **filters
+    ) -> Tuple[Sequence[T], Optional[str]]:
+        """
+        Retrieve a page of records with keyset (cursor) pagination over `(order_by, primary key)`.
+
+        Deep pages cost the same as the first one as long as `(order_by, id)` is indexed.
+
+        :param cursor: Opaque cursor returned with the previous page, None for the first page.
+        :return: Records of the page and the cursor of the next page (None on the last page).
+        """
+        column = getattr(self.model, order_by)
+        key = self.primary_key
+        sort_key = (column, key) if column is not key else (key,)
+
+        query = self._select(filters, [*only, order_by] if only else None, load, load_strategy)
+        if cursor:
+            value, last_key = decode_cursor(cursor, column.type.python_type, key.type.python_type)
+            position = (value, last_key) if column is not key else (last_key,)
+            query = query.where(tuple_(*sort_key) > tuple_(*position) if asc else tuple_(*sort_key) < tuple_(*position))
+        query = query.order_by(*(item.asc() if asc else item.desc() for item in sort_key)).limit(limit + 1)
 
+        result = await self._read(query)
+        items = result.unique().scalars().all()
+
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        last = items[-1]
+        return items, encode_cursor(getattr(last, column.key), getattr(last, key.key))
+
+    @observe_repository
     async def update(self, data: dict, **filters) -> Optional[T]:
         """Update a record with context-managed session and error handling."""
-        async with async_session() as session:
-            try:
-                query = select(self.model).filter_by(**filters)
-                result = await session.execute(query)
-                instance = result.scalars().first()
-                if instance:
-                    for key, value in data.items():
-                        setattr(instance, key, value)
-                    await session.commit()
-                    await session.refresh(instance)
-                    logger.info("%s updated successfully.", self.model.__name__)
-                    return instance
-                return None
-            except (IntegrityError, SQLAlchemyError):
-                await session.rollback()
-                raise
+        if not data:
+            return await self.get_single(**filters)
+        if self.returning_writes:
+            return await self._write_returning(update(self.model).values(**data), "updated", **filters)
+        async with write_scope() as session:
+            query = self._select(filters)
+            result = await session.execute(query)
+            instance = result.scalars().first()
+            if instance:
+                for key, value in data.items():
+                    setattr(instance, key, value)
+                await commit(session)
+                await session.refresh(instance)
+                await run_after_commit(session, partial(self.after_write, instance))
+                logger.info("%s updated successfully.", self.model.__name__)
+                return instance
+            return None
 
+    @observe_repository
     async def delete(self, **filters) -> Optional[T]:
         """Delete a record with context-managed session and error handling."""
-        async with async_session() as session:
-            try:
-                query = select(self.model).filter_by(**filters)
-                result = await session.execute(query)
-                instance = result.scalars().first()
-                if instance:
-                    await session.delete(instance)
-                    await session.commit()
-                    logger.info("%s deleted successfully.", self.model.__name__)
-                    return instance
-                return None
+        if self.returning_writes:
+            return await self._write_returning(delete(self.model), "deleted", **filters)
+        async with write_scope() as session:
+            query = self._select(filters)
+            result = await session.execute(query)
+            instance = result.scalars().first()
+            if instance:
+                await session.delete(instance)
+                await commit(session)
+                await run_after_commit(session, partial(self.after_write, instance))
+                logger.info("%s deleted successfully.", self.model.__name__)
+                return instance
+            return None
+
+    async def _write_returning(self, statement: UpdateBase, action: str, **filters) -> Optional[T]:
+        """
+        Runs an UPDATE or DELETE of the first record matching the filters as a single
+        `... WHERE pk = (SELECT pk ... LIMIT 1) RETURNING *` statement and hydrates the result.
+        Column `onupdate` defaults such as `updated_at` are applied by the statement itself.
+        """
+        async with write_scope() as session:
+            first = select(self.primary_key).where(*build_filters(self.model, filters)).limit(1).scalar_subquery()
+            query = (
+                statement
+                .where(self.primary_key == first)
+                .returning(self.model)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            result = await session.execute(query)
+            instance = result.scalars().first()
+            if instance:
+                await commit(session)
+                await run_after_commit(session, partial(self.after_write, instance))
+                logger.info("%s %s successfully.", self.model.__name__, action)
+                return instance
+            return None
+
+    @observe_repository
+    async def bulk_create(self, rows: Sequence[dict], chunk_size: Optional[int] = None) -> int:
+        """
+        Insert many records without loading them back.
+
+        Batches below `db_copy_threshold` rows are inserted with executemany in chunks of
+        `chunk_size` (default `db_bulk_chunk_size`), larger ones are streamed with asyncpg `COPY`.
+
+        :return: Number of inserted records.
+        """
+        if not rows:
+            return 0
+        async with write_scope() as session:
+            if len(rows) >= settings.db_copy_threshold:
+                await self._copy_records(session, rows)
+            else:
+                for chunk in chunked(rows, chunk_size or settings.db_bulk_chunk_size):
+                    await session.execute(insert(self.model), chunk)
+            await commit(session)
+        logger.info("%s %s records created successfully.", len(rows), self.model.__name__)
+        return len(rows)
+
+    @observe_repository
+    async def bulk_upsert(
+            self, rows: Sequence[dict], index_elements: Sequence[str],
+            update_columns: Optional[Sequence[str]] = None, chunk_size: Optional[int] = None,
+    ) -> int:
+        """
+        Insert many records, updating the existing ones with `INSERT ... ON CONFLICT DO UPDATE`.
+
+        :param index_elements: Unique columns identifying a record, e.g. ["phone_number"].
+        :param update_columns: Columns to overwrite on conflict; defaults to every provided non-key column.
+        :return: Number of inserted or updated records.
+        """
+        if not rows:
+            return 0
+        table = self.model.__table__
+        update_columns = update_columns or [
+            key for key in rows[0] if key not in index_elements and not table.c[key].primary_key
+        ]
+        statement = pg_insert(self.model)
+        set_ = {key: statement.excluded[key] for key in update_columns}
+        # ON CONFLICT does not apply `onupdate` defaults (e.g. updated_at); Python callables are
+        # evaluated once for the whole batch, like SQL expressions such as func.now()
+        for column in table.c:
+            onupdate = column.onupdate
+            if onupdate is not None and column.key not in set_:
+                set_[column.key] = onupdate.arg(None) if onupdate.is_callable else onupdate.arg
+        statement = statement.on_conflict_do_update(index_elements=index_elements, set_=set_).returning(
+            self.primary_key
+        )
+
+        ids: List = []
+        async with write_scope() as session:
+            for chunk in chunked(rows, chunk_size or settings.db_bulk_chunk_size):
+                result = await session.execute(statement, chunk)
+                ids.extend(result.scalars().all())
+            await commit(session)
+            await run_after_commit(session, partial(self.after_bulk_write, ids))
+        logger.info("%s %s records upserted successfully.", len(ids), self.model.__name__)
+        return len(ids)
+
+    @observe_repository
+    async def bulk_update(self, rows: Sequence[dict], chunk_size: Optional[int] = None) -> int:
+        """
+        Update many records by primary key with executemany; every row must contain the primary key.
 
-            except (IntegrityError, SQLAlchemyError):
-                await session.rollback()
-                raise
+        :return: Number of provided records.
+        """
+        if not rows:
+            return 0
+        key = self.primary_key.key
+        async with write_scope() as session:
+            for chunk in chunked(rows, chunk_size or settings.db_bulk_chunk_size):
+                await session.execute(update(self.model), chunk)
+            await commit(session)
+            await run_after_commit(session, partial(self.after_bulk_write, [row[key] for row in rows]))
+        logger.info("%s %s records updated successfully.", len(rows), self.model.__name__)
+        return len(rows)
+
+    async def _copy_records(self, session: AsyncSession, rows: Sequence[dict]) -> None:
+        """Streams the rows with asyncpg `copy_records_to_table`, filling in column defaults."""
+        table = self.model.__table__
+        columns = [column for column in table.c if column.key in rows[0] or column.default is not None]
+        defaults = {}
+        for column in columns:
+            default = column.default
+            if default is None or default.is_callable:
+                continue
+            # SQL expression defaults such as func.now() are evaluated once per batch
+            defaults[column.key] = await session.scalar(select(default.arg)) if default.is_clause_element else default.arg
+
+        def value(row: dict, column):
+            if column.key in row:
+                item = row[column.key]
+            elif column.key in defaults:
+                item = defaults[column.key]
+            else:
+                item = column.default.arg(None)
+            return item.name if isinstance(item, enum.Enum) else item
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        for chunk in chunked(rows, max(settings.db_bulk_chunk_size, settings.db_copy_threshold)):
+            await raw_connection.driver_connection.copy_records_to_table(
+                table.name,
+                schema_name=table.schema,
+                columns=[column.name for column in columns],
+                records=[tuple(value(row, column) for column in columns) for row in chunk],
+            )
+
+    async def after_write(self, instance: T) -> None:
+        """Hook called after a record is updated or deleted, e.g. to invalidate caches."""
+
+    async def after_bulk_write(self, ids: Sequence) -> None:
+        """Hook called with the primary keys of records changed by bulk_upsert or bulk_update."""
 
 
 class SoftDeleteRepository(SQLAlchemyRepository):
     """Repository with soft delete support."""
 
-    async def get_single(self, **filters) -> Optional[T]:
+    async def get_single(
+            self, only: Optional[Sequence[str]] = None, load: Optional[Sequence[str]] = None,
+            load_strategy: str = "selectin", primary: bool = False, **filters
+    ) -> Optional[T]:
         filters.setdefault("is_deleted", False)
-        return await super().get_single(**filters)
+        return await super().get_single(only, load, load_strategy, primary, **filters)
 
-    async def get_list(self, **filters) -> Sequence[T]:
+    async def get_list(
+            self, only: Optional[Sequence[str]] = None, load: Optional[Sequence[str]] = None,
+            load_strategy: str = "selectin", primary: bool = False, **filters
+    ) -> Sequence[T]:
         filters.setdefault("is_deleted", False)
-        return await super().get_list(**filters)
+        return await super().get_list(only, load, load_strategy, primary, **filters)
+
+    async def get_page(
+            self, order_by: str, asc: bool = False, cursor: Optional[str] = None, limit: int = 50,
+            only: Optional[Sequence[str]] = None, load: Optional[Sequence[str]] = None,
+            load_strategy: str = "selectin", **filters
+    ) -> Tuple[Sequence[T], Optional[str]]:
+        filters.setdefault("is_deleted", False)
+        return await super().get_page(order_by, asc, cursor, limit, only, load, load_strategy, **filters)
 
     async def update(self, data: dict, **filters) -> Optional[T]:
         filters.setdefault("is_deleted", False)
         return await super().update(data, **filters)
 
+    @observe_repository
     async def delete(self, **filters) -> Optional[T]:
         filters.setdefault("is_deleted", False)
-        async with async_session() as session:
-            try:
-                query = select(self.model).filter_by(**filters)
-                result = await session.execute(query)
-                instance = result.scalars().first()
-                if instance:
-                    instance.is_deleted = True
-                    await session.commit()
-                    await session.refresh(instance)
-                    logger.info("%s soft deleted successfully.", self.model.__name__)
-                    return instance
-                return None
-            except (IntegrityError, SQLAlchemyError):
-                await session.rollback()
-                raise
+        if self.returning_writes:
+            return await self._write_returning(update(self.model).values(is_deleted=True), "soft deleted", **filters)
+        async with write_scope() as session:
+            query = self._select(filters)
+            result = await session.execute(query)
+            instance = result.scalars().first()
+            if instance:
+                instance.is_deleted = True
+                await commit(session)
+                await session.refresh(instance)
+                await run_after_commit(session, partial(self.after_write, instance))
+                logger.info("%s soft deleted successfully.", self.model.__name__)
+                return instance
+            return None
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.settings import settings
+from app.database.database import replica_engines
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+# Errors after which a replica is considered down and the read is retried on the primary
+REPLICA_ERRORS = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+_last_write_at: ContextVar[float] = ContextVar("last_write_at", default=0.0)
+
+
+class ReplicaRouter:
+    """Round-robin choice of a healthy read replica; failed replicas are skipped for `retry_after` seconds."""
+
+    def __init__(self, engines: List[AsyncEngine], retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._next = 0
+        self._down_until: Dict[int, float] = {}
+
+    def choose(self) -> Optional[AsyncEngine]:
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.engines)
+            if self._down_until.get(index, 0.0) <= now:
+                return self.engines[index]
+        return None
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        index = self.engines.index(engine)
+        self._down_until[index] = time.monotonic() + self.retry_after
+        logger.warning("Read replica %s is down, reading from the primary for %ss", engine.url.host, self.retry_after)
+
+
+def mark_write() -> None:
+    """Records a write in the current context (request), starting its read-your-writes window."""
+    _last_write_at.set(time.monotonic())
+
+
+def read_replica() -> Optional[AsyncEngine]:
+    """
+    Returns the replica engine the next read of the current context should use,
+    or None if it must go to the primary (no replicas, all down, or a recent write in this context).
+    """
+    if not replica_router.engines:
+        return None
+    if time.monotonic() - _last_write_at.get() < settings.db_read_your_writes_seconds:
+        return None
+    return replica_router.choose()
+
+
+replica_router = ReplicaRouter(replica_engines, settings.db_replica_retry_after)
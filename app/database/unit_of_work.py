@@ -0,0 +1,137 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import async_session
+from app.database.routing import mark_write
+
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """
+    Request-scoped session shared by every repository call of the request.
+
+    The session (and its connection) is opened lazily on first use and committed or rolled back
+    once. Repositories only flush inside a unit of work, each write in its own savepoint. The
+    session is not safe for concurrent use, so repository calls of one request must not run in
+    parallel (e.g. via asyncio.gather).
+    Once closed it is finished: repository calls still running in its context (background tasks,
+    streaming response bodies) fall back to standalone sessions.
+    """
+
+    def __init__(self):
+        self._session: Optional[AsyncSession] = None
+        self._after_commit: List[Callable[[], Awaitable[None]]] = []
+        self.finished = False
+
+    @property
+    def has_session(self) -> bool:
+        return self._session is not None
+
+    async def get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = async_session()
+            self._session.info["unit_of_work"] = True
+        return self._session
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Registers a callback (e.g. cache invalidation) to run once the transaction is committed."""
+        self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        if self._session is not None:
+            await self._session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            await callback()
+
+    async def rollback(self) -> None:
+        self._after_commit = []
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        self.finished = True
+        self._after_commit = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def get_unit_of_work() -> Optional[UnitOfWork]:
+    """Returns the unit of work of the current request, if any and not finished yet."""
+    uow = _current_unit_of_work.get()
+    return None if uow is None or uow.finished else uow
+
+
+def set_unit_of_work(uow: Optional[UnitOfWork]) -> Token:
+    """Makes `uow` the current unit of work; pass the returned token to `reset_unit_of_work`."""
+    return _current_unit_of_work.set(uow)
+
+
+def reset_unit_of_work(token: Token) -> None:
+    _current_unit_of_work.reset(token)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Runs the block in a unit of work: committed on success, rolled back on error."""
+    uow = UnitOfWork()
+    token = set_unit_of_work(uow)
+    try:
+        yield uow
+        await uow.commit()
+    except BaseException:
+        await uow.rollback()
+        raise
+    finally:
+        await uow.close()
+        reset_unit_of_work(token)
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Yields the session of the current unit of work, or a standalone session outside of one."""
+    uow = get_unit_of_work()
+    if uow is not None:
+        yield await uow.get_session()
+        return
+    async with async_session() as session:
+        yield session
+
+
+@asynccontextmanager
+async def write_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Like `session_scope`, for writes. Inside a unit of work the block runs in a SAVEPOINT, so a
+    failed write (e.g. a caught IntegrityError) only undoes itself, not the earlier writes of the request.
+    """
+    uow = get_unit_of_work()
+    if uow is not None:
+        session = await uow.get_session()
+        async with session.begin_nested():
+            yield session
+        return
+    async with async_session() as session:
+        yield session
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commits a standalone session; inside a unit of work only flushes, the commit happens once at the end."""
+    mark_write()
+    if session.info.get("unit_of_work"):
+        await session.flush()
+    else:
+        await session.commit()
+
+
+async def run_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Runs the callback now for a standalone session, or after the unit of work commits."""
+    uow = get_unit_of_work()
+    if session.info.get("unit_of_work") and uow is not None:
+        uow.after_commit(callback)
+    else:
+        await callback()
@@ -0,0 +1,74 @@
+import time
+from typing import Any
+
+from botocore.exceptions import ClientError
+from redis.asyncio import Redis
+
+from app.core.metrics import CACHE_REQUESTS, REDIS_DURATION
+from app.core.settings import settings
+from app.integrations.redis.redis_client import redis_client
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+class S3ObjectIndex:
+    """
+    Redis index of content-addressed objects already stored in S3.
+
+    Keys are derived from the SHA-256 of the content, so a known key means the bytes are already
+    in the bucket and the upload can be skipped. On an index miss the object is checked with
+    HEAD (it may have been uploaded by another service or before the index existed); Redis
+    failures degrade to HEAD, and HEAD failures to a regular upload. Entries expire after `ttl` so objects removed out of band
+    are eventually forgotten.
+    """
+
+    def __init__(self, redis: Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def key(bucket_name: str, object_key: str) -> str:
+        return f"s3:object:{bucket_name}:{object_key}"
+
+    async def exists(self, s3_client: Any, bucket_name: str, object_key: str) -> bool:
+        """Returns True when the object is already stored, checking the index first and S3 on a miss."""
+        start = time.perf_counter()
+        try:
+            indexed = await self.redis.exists(self.key(bucket_name, object_key))
+        except Exception as e:
+            logger.warning("S3 object index read failed: %s", e)
+            indexed = False
+        REDIS_DURATION.labels("exists").observe(time.perf_counter() - start)
+        if indexed:
+            CACHE_REQUESTS.labels("s3_object", "hit").inc()
+            return True
+
+        try:
+            await s3_client.head_object(Bucket=bucket_name, Key=object_key)
+        except ClientError as e:
+            # Without s3:ListBucket a missing key is a 403; dedup is only an optimization, so upload anyway
+            if e.response.get("Error", {}).get("Code") not in NOT_FOUND_CODES:
+                logger.warning("S3 HEAD of %s failed, uploading without dedup: %s", object_key, e)
+            CACHE_REQUESTS.labels("s3_object", "miss").inc()
+            return False
+        CACHE_REQUESTS.labels("s3_object", "head_hit").inc()
+        await self.add(bucket_name, object_key)
+        return True
+
+    async def add(self, bucket_name: str, object_key: str) -> None:
+        try:
+            await self.redis.set(self.key(bucket_name, object_key), 1, ex=self.ttl)
+        except Exception as e:
+            logger.warning("S3 object index write failed: %s", e)
+
+    async def discard(self, bucket_name: str, object_key: str) -> None:
+        try:
+            await self.redis.delete(self.key(bucket_name, object_key))
+        except Exception as e:
+            logger.warning("S3 object index invalidation failed: %s", e)
+
+
+s3_object_index = S3ObjectIndex(redis_client, ttl=settings.s3_object_index_ttl)
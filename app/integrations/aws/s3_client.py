@@ -0,0 +1,82 @@
+from contextlib import AsyncExitStack
+from typing import Any, Optional
+
+import aioboto3
+from botocore.config import Config
+
+from app.core.settings import settings
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class S3ClientPool:
+    """
+    Process-wide aioboto3 S3 client with a tuned HTTP connection pool.
+
+    Started on application startup and closed on shutdown, so credentials are resolved once
+    and uploads reuse keep-alive connections instead of paying a TLS handshake each time.
+    ``create_client()`` builds a standalone client with the same configuration for code
+    running outside the application lifetime (scripts, Celery tasks).
+    """
+
+    def __init__(
+            self,
+            aws_access_key_id: str,
+            aws_secret_access_key: str,
+            region_name: str,
+            endpoint_url: Optional[str] = None,
+            max_pool_connections: int = 50,
+            connect_timeout: float = 5,
+            read_timeout: float = 60,
+    ):
+        self.endpoint_url = endpoint_url
+        self.config = Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            tcp_keepalive=True,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        )
+        self.session = aioboto3.Session(
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            region_name=region_name,
+        )
+        self.client: Optional[Any] = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    @property
+    def started(self) -> bool:
+        return self.client is not None
+
+    def create_client(self):
+        """Returns a new client context manager sharing the pool's session and configuration."""
+        return self.session.client("s3", endpoint_url=self.endpoint_url, config=self.config)
+
+    async def start(self) -> None:
+        """Opens the shared client. Called on application startup."""
+        if self.started:
+            return
+        self._exit_stack = AsyncExitStack()
+        self.client = await self._exit_stack.enter_async_context(self.create_client())
+        logger.info("S3 client started (max pool connections %s)", self.config.max_pool_connections)
+
+    async def close(self) -> None:
+        """Closes the shared client and its connections. Called on application shutdown."""
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self.client = None
+        logger.info("S3 client closed")
+
+
+s3_client_pool = S3ClientPool(
+    aws_access_key_id=settings.aws_access_key_id,
+    aws_secret_access_key=settings.aws_secret_access_key,
+    region_name=settings.region_name,
+    endpoint_url=settings.s3_endpoint_url,
+    max_pool_connections=settings.s3_max_pool_connections,
+    connect_timeout=settings.s3_connect_timeout,
+    read_timeout=settings.s3_read_timeout,
+)
@@ -1,36 +1,48 @@
+import asyncio
 import hashlib
 from io import BytesIO
+from typing import List, Optional, Tuple
 
-import aioboto3
 from fastapi import UploadFile
 
 from app.core.settings import settings
+from app.integrations.aws.dedup import S3ObjectIndex, s3_object_index
+from app.integrations.aws.s3_client import S3ClientPool, s3_client_pool
 from loggers import get_logger
 
 logger = get_logger(__name__)
 
 
 class S3Service:
-    def __init__(self):
+    """
+    Facade over the application-wide S3 client.
+
+    Uses `s3_client_pool` when it has been started (the API process); otherwise, e.g. in scripts
+    or Celery tasks, opens a client of its own for the duration of the context. Uploads of
+    content already in the bucket are skipped when `s3_dedup_enabled` is set (see `S3ObjectIndex`).
+    """
+
+    def __init__(self, pool: Optional[S3ClientPool] = None, index: Optional[S3ObjectIndex] = None):
+        self.pool = pool or s3_client_pool
+        self.index = (index or s3_object_index) if settings.s3_dedup_enabled else None
         self.bucket_name = settings.bucket_name
         self.sample_url = settings.s3_sample_url
-        self.aws_access_key_id = settings.aws_access_key_id
-        self.aws_secret_access_key = settings.aws_secret_access_key
-        self.region_name = settings.region_name
-        self.s3_session = None
+        self.multipart_threshold = settings.s3_multipart_threshold
+        self.part_size = max(settings.s3_part_size, 5 * 1024 * 1024)
+        self.upload_concurrency = settings.s3_upload_concurrency
+        self.s3_client = None
+        self._own_client = None
 
     async def __aenter__(self):
         """
-        Initializes the S3 client when entering the async context.
+        Borrows the shared S3 client, or initializes one when the pool is not started.
         """
+        if self.pool.started:
+            self.s3_client = self.pool.client
+            return self
         try:
-            self.s3_session = aioboto3.Session()
-            self.s3_client = await self.s3_session.client(
-                's3',
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region_name
-            ).__aenter__()
+            self._own_client = self.pool.create_client()
+            self.s3_client = await self._own_client.__aenter__()
             return self
         except Exception as e:
             logger.error("Failed to initialize S3 client: %s", e)
@@ -38,13 +50,16 @@ class S3Service:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """
-        Closes the S3 client when exiting the async context.
+        Closes the S3 client when this context opened it; the shared client stays open.
         """
         try:
-            if self.s3_client:
-                await self.s3_client.__aexit__(exc_type, exc_val, exc_tb)
+            if self._own_client is not None:
+                await self._own_client.__aexit__(exc_type, exc_val, exc_tb)
         except Exception as e:
             logger.error("Failed to close S3 client: %s", e)
+        finally:
+            self._own_client = None
+            self.s3_client = None
 
     async def upload_file(self, file_data: bytes, file_name: str) -> str:
         """
@@ -56,29 +71,116 @@ class S3Service:
         """
         key = await self.generate_hashed_name(file_data, file_name)
         try:
-            await self.s3_client.upload_fileobj(BytesIO(file_data), self.bucket_name, key)
+            if not await self.is_stored(key):
+                await self.s3_client.upload_fileobj(BytesIO(file_data), self.bucket_name, key)
+                await self.mark_stored(key)
             return self.sample_url.format(self.bucket_name, key)
         except Exception as e:
             logger.error("Failed to upload file: %s", e)
             raise
 
-
     async def upload_uploadfile(self, file: UploadFile) -> str:
         """
-        Uploads an UploadFile object to the S3 bucket.
+        Uploads an UploadFile object to the S3 bucket without loading it into memory.
+
+        The file is read twice in chunks: once to compute its content hash (the key), then
+        to upload it, through a single put_object for small files or a multipart upload with
+        at most `s3_upload_concurrency` parts in memory for large ones.
 
         :param file: FastAPI UploadFile object.
         :return: URL of the uploaded file.
         """
-        file_data = await file.read()
-        key = await self.generate_hashed_name(file_data, file.filename)
+        file_hash, size = await self.hash_uploadfile(file)
+        key = self.build_hashed_name(file_hash, file.filename)
         try:
-            await self.s3_client.upload_fileobj(BytesIO(file_data), self.bucket_name, key)
+            if await self.is_stored(key):
+                return self.sample_url.format(self.bucket_name, key)
+            if size < self.multipart_threshold:
+                await self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=await file.read())
+            else:
+                await self._multipart_upload(file, key)
+            await self.mark_stored(key)
             return self.sample_url.format(self.bucket_name, key)
         except Exception as e:
             logger.error("Failed to upload UploadFile: %s", e)
             raise
 
+    async def is_stored(self, key: str) -> bool:
+        """
+        Checks whether a content-addressed key is already in the bucket.
+
+        :param key: Key (path) of the file in S3.
+        :return: True if the upload can be skipped.
+        """
+        if self.index is None:
+            return False
+        return await self.index.exists(self.s3_client, self.bucket_name, key)
+
+    async def mark_stored(self, key: str) -> None:
+        if self.index is not None:
+            await self.index.add(self.bucket_name, key)
+
+    async def hash_uploadfile(self, file: UploadFile) -> Tuple[str, int]:
+        """
+        Computes the SHA-256 of an UploadFile chunk by chunk and rewinds it.
+
+        :param file: FastAPI UploadFile object.
+        :return: Hex digest and size of the file in bytes.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        await file.seek(0)
+        while chunk := await file.read(self.part_size):
+            # hashlib releases the GIL on large buffers, keep the event loop free meanwhile
+            await asyncio.to_thread(hasher.update, chunk)
+            size += len(chunk)
+        await file.seek(0)
+        return hasher.hexdigest(), size
+
+    async def _multipart_upload(self, file: UploadFile, key: str) -> None:
+        upload = await self.s3_client.create_multipart_upload(Bucket=self.bucket_name, Key=key)
+        upload_id = upload["UploadId"]
+        semaphore = asyncio.Semaphore(self.upload_concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def upload_part(part_number: int, chunk: bytes) -> dict:
+            try:
+                response = await self.s3_client.upload_part(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=part_number, Body=chunk
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            finally:
+                semaphore.release()
+
+        try:
+            part_number = 1
+            while True:
+                # The next part is only read once a slot is free, which bounds memory per upload
+                await semaphore.acquire()
+                failed = next((task for task in tasks if task.done() and task.exception()), None)
+                if failed is not None:
+                    raise failed.exception()
+                chunk = await file.read(self.part_size)
+                if not chunk:
+                    semaphore.release()
+                    break
+                tasks.append(asyncio.create_task(upload_part(part_number, chunk)))
+                part_number += 1
+
+            parts = await asyncio.gather(*tasks)
+            await self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            except Exception as e:
+                logger.error("Failed to abort multipart upload %s: %s", upload_id, e)
+            raise
+
     async def delete_file(self, key: str) -> None:
         """
         Deletes a file from the S3 bucket.
@@ -87,6 +189,8 @@ class S3Service:
         """
         try:
             await self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+            if self.index is not None:
+                await self.index.discard(self.bucket_name, key)
         except Exception as e:
             logger.error("Failed to delete file: %s", e)
             raise
@@ -101,9 +205,19 @@ class S3Service:
         :return: Hashed name with the original file extension.
         """
         try:
-            file_hash = hashlib.sha256(file_data).hexdigest()
-            file_extension = file_name.split('.')[-1]
-            return f"{file_hash}.{file_extension}"
+            return S3Service.build_hashed_name(hashlib.sha256(file_data).hexdigest(), file_name)
         except Exception as e:
             logger.error("Failed to generate hashed name: %s", e)
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def build_hashed_name(file_hash: str, file_name: str) -> str:
+        """
+        Builds the content-addressed key from a SHA-256 hex digest and the original file name.
+
+        :param file_hash: Hex digest of the file content.
+        :param file_name: Original file name to extract the extension.
+        :return: Hashed name with the original file extension.
+        """
+        file_extension = file_name.split('.')[-1]
+        return f"{file_hash}.{file_extension}"
\ No newline at end of file
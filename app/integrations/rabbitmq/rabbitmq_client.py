@@ -0,0 +1,69 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aio_pika
+from aio_pika.abc import AbstractRobustChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
+
+from app.core.settings import settings
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class RabbitMQPool:
+    """
+    Process-wide pool of robust RabbitMQ connections.
+
+    The WebSocket connections of a worker share a small number of AMQP connections
+    (through the branch subscription hub) instead of opening one per socket. Connections
+    are created with ``connect_robust`` and restore themselves (and their channels)
+    after a broker restart.
+    """
+
+    def __init__(self, dsn: str, max_connections: int):
+        self.dsn = dsn
+        self.max_connections = max_connections
+        self._connection_pool: Optional[Pool] = None
+
+    async def _create_connection(self) -> AbstractRobustConnection:
+        connection = await aio_pika.connect_robust(self.dsn)
+        logger.info("RabbitMQ connection opened (pool size %s)", self.max_connections)
+        return connection
+
+    def _ensure_pool(self) -> None:
+        """The pool is created lazily so that it is bound to the running event loop."""
+        if self._connection_pool is None or self._connection_pool.is_closed:
+            self._connection_pool = Pool(self._create_connection, max_size=self.max_connections)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AbstractRobustConnection]:
+        """Borrows one of the shared connections."""
+        self._ensure_pool()
+        async with self._connection_pool.acquire() as connection:
+            yield connection
+
+    async def open_channel(self, prefetch_count: Optional[int] = None) -> AbstractRobustChannel:
+        """
+        Opens a dedicated long-lived channel on one of the shared connections.
+
+        Used by consumers that keep a channel for the lifetime of the process; the caller closes it.
+        """
+        async with self.connection() as connection:
+            channel = await connection.channel()
+        if prefetch_count:
+            await channel.set_qos(prefetch_count=prefetch_count)
+        return channel
+
+    async def close(self) -> None:
+        """Closes all pooled connections. Called on application shutdown."""
+        if self._connection_pool is not None and not self._connection_pool.is_closed:
+            await self._connection_pool.close()
+        self._connection_pool = None
+        logger.info("RabbitMQ pool closed")
+
+
+rabbitmq_pool = RabbitMQPool(
+    settings.build_rabbitmq_dsn(),
+    max_connections=settings.rabbitmq_max_connections,
+)
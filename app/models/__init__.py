@@ -0,0 +1,7 @@
+"""
+Imports every model so that `Base.metadata` and the mapper registry know all tables
+(see `app.database.database` and `migrations/env.py`).
+"""
+from app.users.models import User  # noqa
+
+__all__ = ["User"]
@@ -2,9 +2,10 @@ import jwt
 from fastapi import HTTPException, status, Security
 from fastapi.security.api_key import APIKeyHeader
 
-from app.core.settings import settings
-from app.user.dependencies import get_user_service
-from app.user.models import User
+from app.users.auth.tokens import user_token_service
+from app.users.cache import user_cache
+from app.users.dependencies import get_user_service
+from app.users.models import User
 from loggers import get_logger
 
 logger = get_logger(__name__)
@@ -19,17 +20,17 @@ credentials_exception = HTTPException(
 token_expired_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="token has been expired")
 
 
-async def get_current_user(
-        token: str = Security(access_token_header),
-) -> User:
+def decode_token(token: str, mode: str) -> dict:
+    """
+    Validates a user JWT of the given mode and returns its payload.
+
+    :raises HTTPException: 401 if the token is invalid, expired or of another mode.
+    """
     try:
-        payload = jwt.decode(
-            token, settings.jwt_user_secret_key, algorithms=[settings.algorithm]
-        )
+        payload = user_token_service.decode(token)
         id = payload.get("sub")
-        mode = payload.get("mode")
 
-        if id is None or mode != "access_token":
+        if id is None or payload.get("mode") != mode:
             raise credentials_exception
 
     except jwt.ExpiredSignatureError:
@@ -38,7 +39,15 @@ async def get_current_user(
     except jwt.InvalidTokenError:
         raise credentials_exception
 
-    user = await get_user_service().get_single(id=id)
+    return payload
+
+
+async def get_current_user(
+        token: str = Security(access_token_header),
+) -> User:
+    id = decode_token(token, "access_token")["sub"]
+
+    user = await user_cache.get(id, lambda: get_user_service().get_single(id=id, primary=True))
     if not user or user.is_deleted or user.is_blocked:
         raise credentials_exception
 
@@ -48,25 +57,9 @@ async def get_current_user(
 async def get_access_by_refresh_token(
         refresh_token: str = Security(refresh_token_header),
 ) -> User:
-    try:
-        payload = jwt.decode(
-            refresh_token,
-            settings.jwt_user_secret_key,
-            algorithms=[settings.algorithm],
-        )
-        id = payload.get("sub")
-        mode = payload.get("mode")
-
-        if id is None or mode != "refresh_token":
-            raise credentials_exception
-
-    except jwt.ExpiredSignatureError:
-        raise token_expired_exception
-
-    except jwt.InvalidTokenError:
-        raise credentials_exception
+    id = decode_token(refresh_token, "refresh_token")["sub"]
 
-    user = await get_user_service().get_single(id=id)
+    user = await get_user_service().get_single(id=id, primary=True)
     if not user or user.is_deleted or user.is_blocked:
         raise credentials_exception
 
@@ -2,12 +2,12 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 
-from app.user.auth.dependencies import get_access_by_refresh_token
-from app.user.auth.schemas import TokenModel, TokenRefreshModel
-from app.user.auth.security import create_access_token, create_refresh_token
-from app.user.dependencies import get_user_service
-from app.user.models import User
-from app.user.schemas import AuthModel, OtpVerifyModel, SendOTPModel
-from app.user.services import UserService
+from app.users.auth.dependencies import get_access_by_refresh_token
+from app.users.auth.schemas import TokenModel, TokenRefreshModel
+from app.users.auth.security import create_access_token, create_refresh_token
+from app.users.dependencies import get_user_service
+from app.users.models import User
+from app.users.schemas import AuthModel, OtpVerifyModel, SendOTPModel
+from app.users.services import UserService
 
 router = APIRouter(prefix='/auth')
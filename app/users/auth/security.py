@@ -1,27 +1,16 @@
-from datetime import timedelta, datetime
-
-import jwt
+from datetime import timedelta
 
 from app.core.settings import settings
+from app.users.auth.tokens import user_token_service
 
 
 def create_access_token(data: dict) -> str:
-    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    data["exp"] = expire
-    data["mode"] = "access_token"
-
-    encoded_jwt = jwt.encode(data, settings.jwt_user_secret_key, settings.algorithm)
-
-    return encoded_jwt
+    return user_token_service.encode(
+        data, "access_token", timedelta(minutes=settings.access_token_expire_minutes)
+    )
 
 
 def create_refresh_token(data: dict) -> str:
-    expire = datetime.utcnow() + timedelta(
-        minutes=settings.refresh_token_expire_minutes
+    return user_token_service.encode(
+        data, "refresh_token", timedelta(minutes=settings.refresh_token_expire_minutes)
     )
-    data["exp"] = expire
-    data["mode"] = "refresh_token"
-
-    encoded_jwt = jwt.encode(data, settings.jwt_user_secret_key, settings.algorithm)
-
-    return encoded_jwt
\ No newline at end of file
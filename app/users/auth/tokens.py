@@ -0,0 +1,88 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+from app.core.cache import TTLCache
+from app.core.settings import settings
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class TokenService:
+    """
+    Signs and verifies JWTs with keys prepared once at startup.
+
+    HMAC algorithms use `secret`; asymmetric ones (ES256, EdDSA, RS256, ...) sign with the PEM
+    `private_key` and verify with `public_key`, so a process holding only the public key can
+    verify tokens but not issue them. Recently verified tokens are cached (never past their `exp`)
+    so repeated requests with the same token skip signature verification.
+    """
+
+    def __init__(
+            self,
+            algorithm: str,
+            secret: Optional[str] = None,
+            private_key: Optional[str] = None,
+            public_key: Optional[str] = None,
+            cache_size: int = 10000,
+            cache_ttl: float = 60,
+    ):
+        self.algorithm = algorithm
+        self._jwt = jwt.PyJWT()
+        implementation = get_default_algorithms()[algorithm]
+
+        if algorithm in HMAC_ALGORITHMS:
+            if not secret:
+                raise ValueError(f"{algorithm} requires a secret")
+            self._signing_key = self._verifying_key = implementation.prepare_key(secret)
+        else:
+            if not private_key and not public_key:
+                raise ValueError(f"{algorithm} requires a private or public key")
+            self._signing_key = implementation.prepare_key(private_key) if private_key else None
+            self._verifying_key = (
+                implementation.prepare_key(public_key) if public_key else self._signing_key.public_key()
+            )
+
+        self.verified: TTLCache[dict] = TTLCache(max_size=cache_size, ttl=cache_ttl)
+
+    def encode(self, data: dict, mode: str, expires_in: timedelta) -> str:
+        """
+        Signs a token of the given mode without modifying `data`.
+
+        :raises RuntimeError: If the service only holds a public key.
+        """
+        if self._signing_key is None:
+            raise RuntimeError("token service has no signing key")
+        payload = {**data, "exp": datetime.now(timezone.utc) + expires_in, "mode": mode}
+        return self._jwt.encode(payload, self._signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        """
+        Verifies the token and returns a copy of its payload.
+
+        :raises jwt.InvalidTokenError: If the token is invalid or expired.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        payload = self.verified.get(key)
+        if payload is not None:
+            return dict(payload)
+
+        payload = self._jwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+        exp: Any = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            self.verified.set(key, payload, ttl=exp - time.time())
+        return dict(payload)
+
+
+user_token_service = TokenService(
+    algorithm=settings.algorithm,
+    secret=settings.jwt_user_secret_key,
+    private_key=settings.jwt_user_private_key,
+    public_key=settings.jwt_user_public_key,
+    cache_size=settings.jwt_verified_cache_size,
+    cache_ttl=settings.jwt_verified_cache_ttl,
+)
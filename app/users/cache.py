@@ -0,0 +1,121 @@
+import json
+import time
+import uuid
+from datetime import date, datetime
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from app.core.cache import TTLCache
+from app.core.metrics import CACHE_REQUESTS, REDIS_DURATION
+from app.core.settings import settings
+from app.integrations.redis.redis_client import redis_client
+from app.users.models import User
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class UserCache:
+    """
+    Two-tier read-through cache of users for authentication.
+
+    L1 is a short-lived in-process TTL/LRU, L2 is Redis (``user:{id}``). Only column values are cached,
+    so returned users are transient objects without loaded relationships. Entries are invalidated by
+    `UserRepository` on update and delete; other workers may serve a stale L1 entry for at most
+    `user_cache_local_ttl` seconds.
+    """
+
+    def __init__(self, local_ttl: int, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.local = TTLCache(max_size=max_size, ttl=local_ttl)
+        self.hits = 0
+        self.misses = 0
+        # Table columns rather than inspect(User): mapper configuration must not run at import time
+        self._columns = {column.key: column.type for column in User.__table__.columns}
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def key(user_id) -> str:
+        return f"user:{user_id}"
+
+    async def get(self, user_id, loader: Callable[[], Awaitable[Optional[User]]]) -> Optional[User]:
+        """Returns the cached user, loading and caching it with `loader` on a miss."""
+        user_id = str(user_id)
+        user = self.local.get(user_id)
+        if user is not None:
+            self.hits += 1
+            CACHE_REQUESTS.labels("user", "local_hit").inc()
+            return user
+
+        start = time.perf_counter()
+        try:
+            cached = await redis_client.get(self.key(user_id))
+        except Exception as e:
+            logger.warning("User cache read failed: %s", e)
+            cached = None
+        REDIS_DURATION.labels("get").observe(time.perf_counter() - start)
+        if cached is not None:
+            self.hits += 1
+            CACHE_REQUESTS.labels("user", "redis_hit").inc()
+            user = self.deserialize(cached)
+            self.local.set(user_id, user)
+            return user
+
+        self.misses += 1
+        CACHE_REQUESTS.labels("user", "miss").inc()
+        user = await loader()
+        if user is not None:
+            self.local.set(user_id, user)
+            try:
+                await redis_client.set(self.key(user_id), self.serialize(user), ex=self.ttl)
+            except Exception as e:
+                logger.warning("User cache write failed: %s", e)
+        return user
+
+    async def invalidate(self, user_id) -> None:
+        user_id = str(user_id)
+        self.local.delete(user_id)
+        try:
+            await redis_client.delete(self.key(user_id))
+        except Exception as e:
+            logger.warning("User cache invalidation failed: %s", e)
+
+    def serialize(self, user: User) -> str:
+        return json.dumps({key: self._dump(getattr(user, key)) for key in self._columns})
+
+    def deserialize(self, data: str) -> User:
+        values = json.loads(data)
+        return User(**{key: self._load(self._columns[key].python_type, value) for key, value in values.items()})
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+    @staticmethod
+    def _load(python_type, value):
+        if value is None:
+            return None
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is uuid.UUID or issubclass(python_type, Enum):
+            return python_type(value)
+        return value
+
+
+user_cache = UserCache(
+    local_ttl=settings.user_cache_local_ttl,
+    ttl=settings.user_cache_ttl,
+    max_size=settings.user_cache_size,
+)
@@ -1,5 +1,5 @@
-from app.user.repositories import UserRepository
-from app.user.services import UserService
+from app.users.repositories import UserRepository
+from app.users.services import UserService
 
 
 def get_user_service():
@@ -1,12 +1,11 @@
-class DatabaseError(Exception):
-    pass
+from app.core.exceptions import FilteringError  # noqa
 
 
-class IntegrityViolationError(Exception):
+class DatabaseError(Exception):
     pass
 
 
-class FilteringError(Exception):
+class IntegrityViolationError(Exception):
     pass
 
 
@@ -11,9 +11,10 @@ from sqlalchemy.orm import joinedload
 
 from app.database.database import async_session
 from app.database.repositories import SQLAlchemyRepository
-from app.user.domain.repositories import AbstractUserRepository
-from app.user.exceptions import FilteringError
-from app.user.models import User
+from app.users.cache import user_cache
+from app.users.domain.repositories import AbstractUserRepository
+from app.users.exceptions import FilteringError
+from app.users.models import User
 from loggers import get_logger
 
 logger = get_logger(__name__)
@@ -25,3 +26,10 @@ class UserRepository(SQLAlchemyRepository, AbstractUserRepository):
     """
     def __init__(self):
         super().__init__(User)
+
+    async def after_write(self, instance: User) -> None:
+        await user_cache.invalidate(instance.id)
+
+    async def after_bulk_write(self, ids) -> None:
+        for user_id in ids:
+            await user_cache.invalidate(user_id)
@@ -2,10 +2,10 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 
-from app.user.auth.dependencies import get_current_user
-from app.user.dependencies import get_user_service
-from app.user.models import User
-from app.user.services import UserService
+from app.users.auth.dependencies import get_current_user
+from app.users.dependencies import get_user_service
+from app.users.models import User
+from app.users.services import UserService
 from loggers import get_logger
 
 router = APIRouter(prefix='/profile')
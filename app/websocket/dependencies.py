@@ -0,0 +1,52 @@
+import asyncio
+import hashlib
+from typing import Dict
+
+from app.users.auth.dependencies import credentials_exception, decode_token
+from app.users.cache import user_cache
+from app.users.dependencies import get_user_service
+from app.users.models import User
+
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+async def authenticate_token(token: str) -> User:
+    """
+    Validates a WebSocket access token and returns its user.
+
+    Concurrent checks of the same token share one lookup, so reconnect storms after a deploy do not
+    hit the database once per client. Only the verified token payload is cached (by the token service);
+    the user comes from `user_cache`, which is invalidated on writes, so a blocked or deleted user is
+    refused right away.
+
+    :raises HTTPException: 401 if the token is invalid or the user is deleted or blocked.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    while (in_flight := _in_flight.get(key)) is not None:
+        try:
+            return await asyncio.shield(in_flight)
+        except asyncio.CancelledError:
+            # The handshake doing the lookup was cancelled (e.g. its client left): look up again
+            # unless this handshake is being cancelled as well
+            if asyncio.current_task().cancelling() or not in_flight.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        payload = decode_token(token, "access_token")
+        user = await user_cache.get(payload["sub"], lambda: get_user_service().get_single(id=payload["sub"], primary=True))
+        if not user or user.is_deleted or user.is_blocked:
+            raise credentials_exception
+        future.set_result(user)
+        return user
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved when nobody else is waiting for it
+        future.exception()
+        raise
+    finally:
+        # Cancellation is not an Exception: never leave concurrent handshakes waiting forever
+        if not future.done():
+            future.cancel()
+        del _in_flight[key]
@@ -0,0 +1,15 @@
+import enum
+
+
+class OverflowPolicy(str, enum.Enum):
+    """What to do when a WebSocket outbound buffer is full."""
+    drop_oldest = "drop_oldest"
+    coalesce = "coalesce"
+    disconnect = "disconnect"
+
+
+class EventType(str, enum.Enum):
+    """Type of a WebSocket event, sent to clients as its `event` field."""
+    message = "message"
+    notification = "notification"
+    user_updated = "user_updated"
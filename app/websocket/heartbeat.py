@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, List, Optional, Protocol, Set
+
+from app.core.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_REAPED
+from app.core.settings import settings
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class HeartbeatConnection(Protocol):
+    """Connection tracked by the heartbeat scheduler, usually a WebSocketManager."""
+    last_seen: float
+
+    def ping(self) -> None:
+        ...
+
+    def evict(self, code: int) -> None:
+        ...
+
+
+class HeartbeatScheduler:
+    """
+    Pings every WebSocket of the worker from a single timer wheel.
+
+    The wheel has one slot per `tick` of `ping_interval`; a connection is placed in the slot
+    that comes around one interval after it registers, so each tick only touches the
+    connections due for a ping. Connections that have not been seen for `connection_ttl`
+    seconds are reaped instead of pinged.
+    """
+
+    def __init__(self, ping_interval: float, connection_ttl: float, tick: float = 1.0):
+        self.ping_interval = ping_interval
+        self.connection_ttl = connection_ttl
+        self.tick = tick
+        self.reaped = 0
+        self._wheel: List[Set[HeartbeatConnection]] = [set() for _ in range(max(1, int(ping_interval / tick)))]
+        self._slots: Dict[HeartbeatConnection, int] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def live(self) -> int:
+        return len(self._slots)
+
+    def stats(self) -> dict:
+        """Counts of live and reaped connections of this worker."""
+        return {"live": self.live, "reaped": self.reaped}
+
+    def register(self, connection: HeartbeatConnection) -> None:
+        slot = self._cursor
+        self._wheel[slot].add(connection)
+        self._slots[connection] = slot
+        WEBSOCKET_CONNECTIONS.inc()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def unregister(self, connection: HeartbeatConnection) -> None:
+        slot = self._slots.pop(connection, None)
+        if slot is not None:
+            self._wheel[slot].discard(connection)
+            WEBSOCKET_CONNECTIONS.dec()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                self._advance()
+            except Exception as e:
+                logger.error("Heartbeat tick failed: %s", e)
+
+    def _advance(self) -> None:
+        self._cursor = (self._cursor + 1) % len(self._wheel)
+        now = asyncio.get_running_loop().time()
+        for connection in list(self._wheel[self._cursor]):
+            if now - connection.last_seen > self.connection_ttl:
+                self.unregister(connection)
+                self.reaped += 1
+                WEBSOCKET_REAPED.inc()
+                connection.evict(code=1001)
+            else:
+                connection.ping()
+
+    async def close(self) -> None:
+        """Stops the timer. Called on application shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+heartbeat_scheduler = HeartbeatScheduler(settings.ping_interval, settings.connection_ttl)
@@ -0,0 +1,154 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Protocol, Set
+
+import aio_pika
+from aio_pika.abc import AbstractExchange, AbstractIncomingMessage, AbstractQueue, AbstractRobustChannel
+
+from app.core.metrics import AMQP_CONSUMED
+from app.integrations.rabbitmq.rabbitmq_client import RabbitMQPool, rabbitmq_pool
+from app.websocket.repositories import BranchEvent
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class BranchSubscriber(Protocol):
+    """Local receiver of branch events, usually a WebSocketManager."""
+
+    async def deliver(self, event: BranchEvent) -> None:
+        ...
+
+
+@dataclass
+class BranchConsumer:
+    """AMQP resources backing the live subscription of a single branch."""
+    queue: AbstractQueue
+    exchange: AbstractExchange
+    consumer_tag: str
+
+
+class BranchSubscriptionHub:
+    """
+    Per-process registry of live branch subscriptions.
+
+    Keeps a single exclusive queue and consumer per branch, no matter how many local
+    subscribers listen to it, and fans every message out to them from memory. Subscriptions
+    are ref-counted: the first local client binds the queue to ``exchange_branch_{branch_id}``
+    and the last one to leave unbinds and deletes it.
+    """
+
+    def __init__(self, pool: RabbitMQPool, prefetch_count: int = 100):
+        self.pool = pool
+        self.prefetch_count = prefetch_count
+        self._channel: Optional[AbstractRobustChannel] = None
+        self._channel_lock = asyncio.Lock()
+        self._subscribers: Dict[str, Set[BranchSubscriber]] = {}
+        self._consumers: Dict[str, BranchConsumer] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+
+    async def _get_channel(self) -> AbstractRobustChannel:
+        async with self._channel_lock:
+            if self._channel is None or self._channel.is_closed:
+                self._channel = await self.pool.open_channel(prefetch_count=self.prefetch_count)
+            return self._channel
+
+    @asynccontextmanager
+    async def _branch_lock(self, branch_id: str) -> AsyncIterator[None]:
+        """
+        Serializes subscribe/unsubscribe of a branch.
+
+        The lock is dropped only once no coroutine holds or waits for it: a woken waiter does not
+        own the lock until it runs, so `locked()` alone cannot tell that the lock is unused.
+        """
+        lock = self._locks.get(branch_id)
+        if lock is None:
+            lock = self._locks[branch_id] = asyncio.Lock()
+        self._lock_users[branch_id] = self._lock_users.get(branch_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[branch_id] -= 1
+            if not self._lock_users[branch_id]:
+                del self._lock_users[branch_id]
+                del self._locks[branch_id]
+
+    async def subscribe(self, branch_id: str, subscriber: BranchSubscriber) -> None:
+        """Registers a local subscriber for live events of the branch."""
+        async with self._branch_lock(branch_id):
+            subscribers = self._subscribers.get(branch_id)
+            if not subscribers:
+                self._consumers[branch_id] = await self._start_consumer(branch_id)
+                subscribers = self._subscribers[branch_id] = set()
+            subscribers.add(subscriber)
+
+    async def unsubscribe(self, branch_id: str, subscriber: BranchSubscriber) -> None:
+        """Removes a local subscriber; the branch queue is released with the last one."""
+        async with self._branch_lock(branch_id):
+            subscribers = self._subscribers.get(branch_id)
+            if not subscribers or subscriber not in subscribers:
+                return
+            subscribers.discard(subscriber)
+            if subscribers:
+                return
+            del self._subscribers[branch_id]
+            consumer = self._consumers.pop(branch_id, None)
+            if consumer:
+                await self._stop_consumer(branch_id, consumer)
+
+    def subscriber_count(self, branch_id: Optional[str] = None) -> int:
+        """Number of local subscribers, for one branch or for the whole process."""
+        if branch_id is not None:
+            return len(self._subscribers.get(branch_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def _start_consumer(self, branch_id: str) -> BranchConsumer:
+        channel = await self._get_channel()
+        exchange_name = f"exchange_branch_{branch_id}"
+        exchange = await channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT, durable=True)
+        queue = await channel.declare_queue("", exclusive=True, auto_delete=True)
+        await queue.bind(exchange, routing_key="")
+        consumer_tag = await queue.consume(partial(self._on_message, branch_id))
+        logger.info("Branch %s subscribed to exchange %s with queue %s", branch_id, exchange_name, queue.name)
+        return BranchConsumer(queue=queue, exchange=exchange, consumer_tag=consumer_tag)
+
+    async def _stop_consumer(self, branch_id: str, consumer: BranchConsumer) -> None:
+        try:
+            await consumer.queue.cancel(consumer.consumer_tag)
+            await consumer.queue.unbind(consumer.exchange, routing_key="")
+            await consumer.queue.delete(if_unused=False, if_empty=False)
+            logger.info("Branch %s unsubscribed, queue %s deleted", branch_id, consumer.queue.name)
+        except Exception as e:
+            logger.error("Failed to release queue for branch %s: %s", branch_id, e)
+
+    async def _on_message(self, branch_id: str, message: AbstractIncomingMessage) -> None:
+        """Decodes the message once and delivers it to every local subscriber of the branch."""
+        AMQP_CONSUMED.inc()
+        event = BranchEvent(id=message.message_id, message=message.body.decode(), key=message.type)
+        subscribers = tuple(self._subscribers.get(branch_id, ()))
+        results = await asyncio.gather(
+            *(subscriber.deliver(event) for subscriber in subscribers),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                # The owning WebSocketManager notices the disconnect and unsubscribes itself.
+                logger.debug("Dropping message for closed WebSocket on branch %s: %s", branch_id, result)
+        await message.ack()
+
+    async def close(self) -> None:
+        """Stops all consumers and closes the hub channel. Called on application shutdown."""
+        for branch_id, consumer in list(self._consumers.items()):
+            await self._stop_consumer(branch_id, consumer)
+        self._consumers.clear()
+        self._subscribers.clear()
+        if self._channel is not None and not self._channel.is_closed:
+            await self._channel.close()
+        self._channel = None
+
+
+branch_hub = BranchSubscriptionHub(rabbitmq_pool)
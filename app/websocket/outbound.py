@@ -0,0 +1,124 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+from fastapi import WebSocket
+
+from app.websocket.enums import OverflowPolicy
+from app.websocket.repositories import BranchEvent, parse_event_id
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+def batch_frame(messages: Iterable[str]) -> str:
+    """Joins JSON messages into a single JSON array frame."""
+    return "[" + ",".join(messages) + "]"
+
+
+class OutboundBuffer:
+    """
+    Bounded per-connection send buffer drained by a dedicated writer task.
+
+    `put` never blocks, so a slow client cannot hold up the branch consumer. The writer
+    sends everything queued since its last write as one frame (a JSON array when there
+    is more than one event). When the buffer is full the overflow policy applies:
+      - drop_oldest: the oldest queued event is dropped;
+      - coalesce: an event replaces the queued one with the same key, otherwise the oldest is dropped;
+      - disconnect: `put` returns False and the caller evicts the client.
+    """
+
+    def __init__(self, websocket: WebSocket, max_size: int, batch_size: int, policy: OverflowPolicy):
+        self.websocket = websocket
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.policy = OverflowPolicy(policy)
+        self.dropped = 0
+        self.closed = False
+        self._queue: Deque[BranchEvent] = deque()
+        self._keys: Dict[str, BranchEvent] = {}
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, event: BranchEvent) -> bool:
+        """Queues an event; returns False if the client must be disconnected."""
+        if self.closed:
+            return False
+        if len(self._queue) >= self.max_size:
+            if self.policy == OverflowPolicy.disconnect:
+                return False
+            if self.policy == OverflowPolicy.coalesce and event.key in self._keys:
+                # Events are shared with the other connections of the branch: replace, never mutate
+                queued = self._keys[event.key]
+                for index, item in enumerate(self._queue):
+                    if item is queued:
+                        self._queue[index] = event
+                        break
+                self._keys[event.key] = event
+                self.dropped += 1
+                return True
+            self._forget(self._queue.popleft())
+            self.dropped += 1
+        self._queue.append(event)
+        if event.key:
+            self._keys[event.key] = event
+        self._ready.set()
+        return True
+
+    def discard_until(self, last_event_id: Optional[str]) -> None:
+        """Drops queued events that are not newer than `last_event_id` (already sent with the history)."""
+        if not last_event_id:
+            return
+        last = parse_event_id(last_event_id)
+        kept = deque()
+        for event in self._queue:
+            if event.id and parse_event_id(event.id) <= last:
+                self._forget(event)
+            else:
+                kept.append(event)
+        self._queue = kept
+
+    def start(self) -> None:
+        """Starts the writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._writer())
+
+    async def close(self) -> None:
+        """Stops the writer task; queued events are discarded."""
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self._queue.clear()
+        self._keys.clear()
+
+    def _forget(self, event: BranchEvent) -> None:
+        if event.key and self._keys.get(event.key) is event:
+            del self._keys[event.key]
+
+    async def _writer(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                messages = []
+                while self._queue and len(messages) < self.batch_size:
+                    event = self._queue.popleft()
+                    self._forget(event)
+                    messages.append(event.message)
+                if not self._queue:
+                    self._ready.clear()
+                if messages:
+                    await self.websocket.send_text(messages[0] if len(messages) == 1 else batch_frame(messages))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The receive loop of the connection notices the disconnect and cleans up
+            logger.debug("WebSocket writer stopped: %s", e)
+            self.closed = True
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import aio_pika
+from aio_pika.abc import AbstractExchange, AbstractRobustChannel, AbstractRobustConnection
+from redis.asyncio import Redis
+
+from app.core.metrics import AMQP_PUBLISHED
+from app.core.settings import settings
+from app.websocket.repositories import BranchHistoryRepository, with_event_id
+from loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class WebSocketEventPublisher:
+    """
+    Long-lived WebSocket event publisher for synchronous code such as Celery tasks.
+
+    Owns one robust connection and a publisher-confirms channel per process, served by
+    an event loop running in a background thread. Exchange declarations are cached.
+    Every event is first appended to the branch history stream, which assigns its id,
+    and then published once to the fanout exchange (exchange_branch_{branch_id}).
+    """
+
+    def __init__(self, dsn: str, redis_dsn: str, timeout: float = 10.0):
+        self.dsn = dsn
+        self.redis_dsn = redis_dsn
+        self.timeout = timeout
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._connection: Optional[AbstractRobustConnection] = None
+        self._channel: Optional[AbstractRobustChannel] = None
+        self._exchanges: Dict[str, AbstractExchange] = {}
+        self._history: Optional[BranchHistoryRepository] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Starts the publisher loop lazily, once per process (safe after a prefork fork)."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._connection = None
+                self._channel = None
+                self._exchanges = {}
+                self._history = None
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="websocket-event-publisher", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _run(self, coro):
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result(self.timeout)
+
+    async def _get_channel(self) -> AbstractRobustChannel:
+        if self._connection is None or self._connection.is_closed:
+            self._connection = await aio_pika.connect_robust(self.dsn)
+            self._channel = None
+        if self._channel is None or self._channel.is_closed:
+            self._channel = await self._connection.channel(publisher_confirms=True)
+            self._exchanges.clear()
+        return self._channel
+
+    async def _get_exchange(self, branch_id: str) -> AbstractExchange:
+        exchange = self._exchanges.get(branch_id)
+        if exchange is not None:
+            return exchange
+
+        channel = await self._get_channel()
+        exchange = await channel.declare_exchange(
+            f"exchange_branch_{branch_id}",
+            aio_pika.ExchangeType.FANOUT,
+            durable=True
+        )
+        self._exchanges[branch_id] = exchange
+        return exchange
+
+    def _get_history(self) -> BranchHistoryRepository:
+        if self._history is None:
+            self._history = BranchHistoryRepository(Redis.from_url(self.redis_dsn))
+        return self._history
+
+    async def _publish(self, events: Sequence[Tuple[str, str, Optional[str]]]) -> int:
+        event_ids = await self._get_history().append_many([(branch_id, payload) for branch_id, payload, _ in events])
+        confirmations = []
+        for event_id, (branch_id, payload, key) in zip(event_ids, events):
+            exchange = await self._get_exchange(branch_id)
+            message_obj = aio_pika.Message(
+                body=with_event_id(event_id, payload).encode(),
+                message_id=event_id,
+                type=key,
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            )
+            confirmations.append(exchange.publish(message_obj, routing_key=""))
+        # Confirms are awaited together, so a batch costs a single round trip
+        await asyncio.gather(*confirmations)
+        AMQP_PUBLISHED.inc(len(confirmations))
+        return len(confirmations)
+
+    def publish(self, branch_id: str, message: str, key: Optional[str] = None) -> None:
+        """
+        Stores and publishes a single event and waits for the broker confirm.
+
+        :param key: Optional coalescing key; queued events with the same key may be merged for slow clients.
+        """
+        self._run(self._publish([(branch_id, message, key)]))
+
+    def publish_batch(self, events: Iterable[Tuple[str, str, Optional[str]]]) -> int:
+        """
+        Stores and publishes many events in one round trip.
+
+        :param events: Iterable of (branch_id, message, key) tuples, message being a JSON object.
+        :return: Number of confirmed events.
+        """
+        return self._run(self._publish(list(events)))
+
+    def close(self) -> None:
+        """Closes the connection and stops the publisher loop."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            if self._connection is not None and not self._connection.is_closed:
+                asyncio.run_coroutine_threadsafe(self._connection.close(), self._loop).result(self.timeout)
+            if self._history is not None:
+                asyncio.run_coroutine_threadsafe(self._history.redis.close(), self._loop).result(self.timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(self.timeout)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._connection = None
+            self._channel = None
+            self._exchanges = {}
+            self._history = None
+
+
+websocket_publisher = WebSocketEventPublisher(settings.build_rabbitmq_dsn(), settings.build_redis_dsn())
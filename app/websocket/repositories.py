@@ -0,0 +1,91 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from redis.asyncio import Redis
+
+from app.core.settings import settings
+
+
+@dataclass
+class BranchEvent:
+    """A WebSocket event of a branch; `message` is the JSON text sent to clients, `key` is used for coalescing."""
+    id: Optional[str]
+    message: str
+    key: Optional[str] = None
+
+
+def with_event_id(event_id: str, payload: str) -> str:
+    """
+    Returns the JSON object payload (``{"event": ...}``) with its ``id`` set to the event id.
+
+    :raises ValueError: If the payload is not a JSON object.
+    """
+    data = json.loads(payload)
+    if not isinstance(data, dict):
+        raise ValueError("event payload must be a JSON object")
+    return json.dumps({**data, "id": event_id})
+
+
+def parse_event_id(event_id: str) -> Tuple[int, int]:
+    """Converts a Redis stream id (``<ms>-<seq>``) into a comparable tuple."""
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class BranchHistoryRepository:
+    """
+    Per-branch event history kept in a capped Redis stream (``ws:history:{branch_id}``).
+
+    The stream works as a ring buffer: it is trimmed to ``max_len`` events on every append
+    and expires ``ttl`` seconds after the last event. Stream ids are used as event ids, so a
+    client that reconnects with ``last_event_id`` receives only the events it missed.
+    """
+
+    def __init__(self, redis: Redis, max_len: int = settings.ws_history_max_len, ttl: int = settings.ws_history_ttl):
+        self.redis = redis
+        self.max_len = max_len
+        self.ttl = ttl
+
+    @staticmethod
+    def key(branch_id: str) -> str:
+        return f"ws:history:{branch_id}"
+
+    async def append(self, branch_id: str, payload: str) -> str:
+        """Stores an event and returns its id."""
+        return (await self.append_many([(branch_id, payload)]))[0]
+
+    async def append_many(self, events: Sequence[Tuple[str, str]]) -> List[str]:
+        """Stores many (branch_id, payload) events in one pipeline and returns their ids."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for branch_id, payload in events:
+                pipe.xadd(self.key(branch_id), {"payload": payload}, maxlen=self.max_len, approximate=True)
+            for branch_id in {branch_id for branch_id, _ in events}:
+                pipe.expire(self.key(branch_id), self.ttl)
+            results = await pipe.execute()
+        return [self._decode(event_id) for event_id in results[:len(events)]]
+
+    async def read_since(self, branch_id: str, last_event_id: Optional[str] = None) -> List[BranchEvent]:
+        """
+        Returns the events stored after `last_event_id`, or the events of the last `ttl` seconds
+        when no id is given.
+        """
+        if last_event_id:
+            try:
+                parse_event_id(last_event_id)
+            except ValueError:
+                last_event_id = None
+        start = f"({last_event_id}" if last_event_id else f"{int(time.time() * 1000) - self.ttl * 1000}-0"
+        entries = await self.redis.xrange(self.key(branch_id), min=start, max="+", count=self.max_len)
+        return [self._to_event(event_id, fields) for event_id, fields in entries]
+
+    def _to_event(self, event_id, fields: dict) -> BranchEvent:
+        event_id = self._decode(event_id)
+        payload = self._decode(fields.get("payload") or fields.get(b"payload"))
+        return BranchEvent(id=event_id, message=with_event_id(event_id, payload))
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
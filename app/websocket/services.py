@@ -1,126 +1,146 @@
-import aio_pika
+import asyncio
+from typing import Optional
 
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException
 
 from app.core.settings import settings
+from app.integrations.redis.redis_client import redis_client
+from app.websocket.dependencies import authenticate_token
+from app.websocket.heartbeat import heartbeat_scheduler
+from app.websocket.hub import branch_hub
+from app.websocket.outbound import OutboundBuffer, batch_frame
+from app.websocket.repositories import BranchEvent, BranchHistoryRepository
 
 from loggers import get_logger
 
 logger = get_logger(__name__)
 
+PING_MESSAGE = '{"event": "ping"}'
+
 
 class WebSocketManager:
-    """WebSocket connection manager with history saving (long queue) and live distribution via fanout Exchange."""
+    """WebSocket connection manager with history replay (Redis stream) and live distribution via the branch hub."""
     def __init__(self, websocket: WebSocket, branch_id: str):
         self.websocket = websocket
         self.branch_id = branch_id
-        self.rabbitmq_dsn = settings.build_rabbitmq_dsn()
-        self.connection = None
-        self.channel = None
-        self.queue = None
+        self.user = None
+        self.history = BranchHistoryRepository(redis_client)
+        self.outbound = OutboundBuffer(
+            websocket,
+            max_size=settings.ws_send_queue_size,
+            batch_size=settings.ws_send_batch_size,
+            policy=settings.ws_overflow_policy,
+        )
+        self.subscribed = False
+        self.evicted = False
+        self.close_code = 4008
+        self.last_seen = 0.0
+        self._task: Optional[asyncio.Task] = None
 
     async def accept_connection(self):
-        """Accepts the connection and validates the token"""
-        await self.websocket.accept()
+        """Validates the token and accepts the connection; invalid handshakes are rejected before accept"""
         token = self.websocket.query_params.get("token")
         if not token:
             await self.websocket.close(code=4001)
             return False
         try:
-            # call some service
-            pass
+            self.user = await authenticate_token(token)
         except HTTPException:
             await self.websocket.close(code=4001)
             return False
+        await self.websocket.accept()
         return True
 
     async def connect_rabbitmq(self):
         """
-        Connects to RabbitMQ:
-          1. Declares a durable queue (queue_branch_{branch_id}) to store old messages with a TTL of 5 minutes.
-          2. Processes old messages from this queue.
-          3. Declares durable fanout exchange (exchange_branch_{branch_id}) for live distribution.
-          4. Creates a temporary (exclusive, auto_delete) queue tied to exchange for live messages.
+        Connects the WebSocket to the branch events:
+          1. Subscribes to the process-wide branch hub, which owns the single temporary queue
+             bound to the durable fanout exchange (exchange_branch_{branch_id}). Live events
+             go to the bounded outbound buffer of this connection.
+          2. Sends the missed events from the branch history in one batched frame: everything
+             after the `last_event_id` query parameter, or the recent history without it.
+          3. Starts the writer of the outbound buffer and keeps the WebSocket open until the client
+             disconnects, is evicted as a slow consumer or is reaped by the heartbeat scheduler.
         """
+        self._task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        self.last_seen = loop.time()
         try:
-            self.connection = await aio_pika.connect_robust(self.rabbitmq_dsn)
-            self.channel = await self.connection.channel()
-
-            # 1. Declare a durable queue to store old messages
-            durable_queue_name = f"queue_branch_{self.branch_id}"
-            durable_queue = await self.channel.declare_queue(
-                durable_queue_name,
-                durable=True,
-                auto_delete=False,
-                arguments={"x-message-ttl": 300000}  # TTL 5 минут
-            )
-
-            # 2. Process old messages (if any)
-            await self.process_old_messages(durable_queue)
-
-            # 3. Declare durable fanout exchange for live messages
-            exchange_name = f"exchange_branch_{self.branch_id}"
-            exchange = await self.channel.declare_exchange(
-                exchange_name,
-                aio_pika.ExchangeType.FANOUT,
-                durable=True
-            )
-
-            # 4. Create a temporary queue for a live subscription and link it to exchange
-            self.queue = await self.channel.declare_queue("", exclusive=True, auto_delete=True)
-            await self.queue.bind(exchange, routing_key="")
-
-            logger.info(
-                f"WebSocket subscribed to exchange {exchange_name} with temporary queue {self.queue.name}"
-            )
-
-            # Process live messages from the temporary queue
-            async with self.queue.iterator() as queue_iter:
-                async for message in queue_iter:
-                    try:
-                        message_data = message.body.decode()
-                        logger.info("WebSocket sending real-time message: %s", message_data)
-                        await self.websocket.send_text(message_data)
-                        await message.ack()
-                    except (WebSocketDisconnect, RuntimeError):
-                        logger.info("WebSocket disconnected or closed, stopping message processing.")
-                        break
-                    except Exception as e:
-                        logger.error("Error sending real-time message: %s", e)
-                        await message.nack(requeue=True)
-                        break
+            # 1. Live events are fanned out by the hub
+            await branch_hub.subscribe(self.branch_id, self)
+            self.subscribed = True
+
+            # 2. Send the missed events
+            last_event_id = await self.send_history(self.websocket.query_params.get("last_event_id"))
+
+            # 3. Send live events, skipping those already sent with the history
+            self.outbound.discard_until(last_event_id)
+            self.outbound.start()
+            heartbeat_scheduler.register(self)
+            logger.info(f"WebSocket subscribed to live messages of branch {self.branch_id}")
+
+            # Any client message, including the reply to a ping, keeps the connection alive
+            while True:
+                await self.websocket.receive_text()
+                self.last_seen = loop.time()
 
         except WebSocketDisconnect:
             logger.info(f"WebSocket disconnected for branch {self.branch_id}")
+        except asyncio.CancelledError:
+            if not self.evicted:
+                raise
+            logger.info(f"WebSocket evicted for branch {self.branch_id} with code {self.close_code}")
+            await self.close(code=self.close_code)
         except Exception as e:
             logger.error(f"RabbitMQ error for branch {self.branch_id}: {e}")
         finally:
             await self.cleanup()
 
-    async def process_old_messages(self, durable_queue):
+    async def send_history(self, last_event_id: Optional[str]) -> Optional[str]:
+        """
+        Sends the branch history after `last_event_id` as a single JSON array frame.
+
+        :return: Id of the last event sent, or `last_event_id` if there was nothing to send.
         """
-        Retrieves and sends old messages from the durable queue.
+        events = await self.history.read_since(self.branch_id, last_event_id)
+        if not events:
+            return last_event_id
+        await self.websocket.send_text(batch_frame(event.message for event in events))
+        return events[-1].id
+
+    async def deliver(self, event: BranchEvent):
+        """Receives a live event from the branch hub; never waits for the client."""
+        if not self.outbound.put(event) and not self.outbound.closed:
+            self.evict()
+
+    def ping(self):
+        """Queues an application-level ping; the client is expected to answer with any message."""
+        self.outbound.put(BranchEvent(id=None, message=PING_MESSAGE, key="ping"))
+
+    def evict(self, code: int = 4008):
         """
-        while True:
-            try:
-                message = await durable_queue.get(timeout=1.0, no_ack=True)
-            except aio_pika.exceptions.QueueEmpty:
-                logger.info("No old messages in durable queue, moving to live subscription.")
-                break
-
-            try:
-                message_data = message.body.decode()
-                logger.info("WebSocket sending old message: %s", message_data)
-                await self.websocket.send_text(message_data)
-            except (WebSocketDisconnect, RuntimeError):
-                logger.info("WebSocket disconnected or closed during old message processing, dropping message.")
-                break
-            except Exception as e:
-                logger.error("Error sending old message: %s", e)
-                break
+        Disconnects the client: 4008 when its outbound buffer overflows with the disconnect policy,
+        1001 when the heartbeat scheduler reaps it.
+        """
+        if self.evicted:
+            return
+        self.evicted = True
+        self.close_code = code
+        self.outbound.closed = True
+        if self._task is not None:
+            self._task.cancel()
+
+    async def close(self, code: int):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=1.0)
+        except Exception:
+            pass
 
     async def cleanup(self):
-        """Closes the connection to RabbitMQ when the WebSocket is disconnected"""
-        if self.connection:
-            await self.connection.close()
+        """Unsubscribes from the branch hub and the heartbeat and stops the writer when the WebSocket is disconnected"""
+        heartbeat_scheduler.unregister(self)
+        if self.subscribed:
+            await branch_hub.unsubscribe(self.branch_id, self)
+            self.subscribed = False
+        await self.outbound.close()
         logger.info(f"WebSocket closed for branch {self.branch_id}")
@@ -0,0 +1,13 @@
+"""
+Gunicorn settings, loaded automatically when gunicorn is started from the project root, e.g.
+gunicorn -k uvicorn.workers.UvicornWorker -w 2 -b 0.0.0.0:8001 main:app
+"""
+import os
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    """Drops the `livesum` gauge values of an exited worker, so they stop counting towards `/metrics`."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
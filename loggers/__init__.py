@@ -1,5 +1,11 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
 LOG_FILE = os.path.join(LOG_DIR, "debug.log")
@@ -10,24 +16,120 @@ if not os.path.exists(LOG_DIR):
 logging_format = "%(asctime)s [%(levelname)s]|[%(process)d]| %(name)s: %(message)s"
 time_logging_format = "%Y-%m-%d %H:%M:%S"
 
+# "json" emits one JSON object per line (parsed by promtail), "text" uses `logging_format`
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Max INFO/DEBUG records per second per logger; warnings and errors are never dropped. 0 disables it.
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "100"))
+
+# Loggers of this project logged at INFO; everything else (third-party libraries) from WARNING up
+APP_LOGGERS = ("app", "celery_tasks", "main", "__main__")
+
+_lock = threading.Lock()
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as JSON lines with the fields used by the Loki pipeline."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, time_logging_format),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops INFO/DEBUG records of a logger beyond `rate` per second and reports how many were
+    dropped with the first record of the next second.
+    """
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = rate
+        self._windows = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rate or record.levelno >= logging.WARNING:
+            return True
+        second = int(time.monotonic())
+        window, count, dropped = self._windows.get(record.name, (second, 0, 0))
+        if window != second:
+            if dropped:
+                record.msg = f"{record.msg} [{dropped} messages of this logger suppressed]"
+            window, count, dropped = second, 0, 0
+        if count >= self.rate:
+            self._windows[record.name] = (window, count, dropped + 1)
+            return False
+        self._windows[record.name] = (window, count + 1, dropped)
+        return True
+
+
+def get_formatter():
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(logging_format, time_logging_format)
+
 
 def get_file_handler():
     file_handler = logging.FileHandler(LOG_FILE, "a", "utf-8")
     file_handler.setLevel(logging.WARNING)
-    file_handler.setFormatter(logging.Formatter(logging_format, time_logging_format))
+    file_handler.setFormatter(get_formatter())
     return file_handler
 
 
 def get_stream_handler():
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(logging.INFO)
-    stream_handler.setFormatter(logging.Formatter(logging_format, time_logging_format))
+    stream_handler.setFormatter(get_formatter())
     return stream_handler
 
 
+def _start_listener(log_queue):
+    global _listener
+    _listener = QueueListener(log_queue, get_file_handler(), get_stream_handler(), respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging():
+    """
+    Sets up the logging pipeline once per process.
+
+    Loggers only put records on an in-memory queue; a background listener thread writes
+    them to the stream and file handlers, so logging never blocks the event loop on I/O.
+    """
+    with _lock:
+        if _listener is not None:
+            return
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT))
+
+        root = logging.getLogger()
+        # INFO on the root would also pass on the INFO records of every library, and duplicate the
+        # SQLAlchemy echo lines, which have their own handler
+        root.setLevel(logging.WARNING)
+        root.addHandler(queue_handler)
+        for name in APP_LOGGERS:
+            logging.getLogger(name).setLevel(logging.INFO)
+        _start_listener(log_queue)
+
+        atexit.register(_stop_listener)
+        # The listener thread does not survive fork (gunicorn/celery workers)
+        os.register_at_fork(after_in_child=lambda: _start_listener(log_queue))
+
+
 def get_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    logger.addHandler(get_file_handler())
-    logger.addHandler(get_stream_handler())
-    return logger
\ No newline at end of file
+    configure_logging()
+    return logging.getLogger(name)
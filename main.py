@@ -1,6 +1,5 @@
 import asyncio
 
-import sentry_sdk
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,9 +7,15 @@ from fastapi_pagination import add_pagination
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 
 from app.database.database import init_models
-from app.core.middleware import ValidationErrorMiddleware, UnexpectedErrorMiddleware, DatabaseErrorMiddleware
+from app.core.metrics import metrics_endpoint
+from app.core.middleware import ErrorHandlingMiddleware, MetricsMiddleware, UnitOfWorkMiddleware
+from app.integrations.aws.s3_client import s3_client_pool
+from app.integrations.rabbitmq.rabbitmq_client import rabbitmq_pool
 from app.integrations.redis.redis_client import redis_client
+from app.websocket.heartbeat import heartbeat_scheduler
+from app.websocket.hub import branch_hub
 from app.core.routes import v1
+from app.core.sentry import init_sentry
 from app.core.settings import settings
 from loggers import get_logger
 
@@ -21,18 +26,7 @@ logger = get_logger(__name__)
 
 
 def get_application() -> FastAPI:
-    sentry_sdk.init(
-        dsn=settings.sentry_dsn,
-        # Set traces_sample_rate to 1.0 to capture 100%
-        # of transactions for tracing.
-        traces_sample_rate=1.0,
-        _experiments={
-            # Set continuous_profiling_auto_start to True
-            # to automatically start the profiler on when
-            # possible.
-            "continuous_profiling_auto_start": True,
-        },
-    )
+    init_sentry()
     application = FastAPI(
         title=settings.project_name,
         debug=settings.debug,
@@ -40,6 +34,7 @@ def get_application() -> FastAPI:
     )
 
     application.include_router(v1, prefix="/api/v1")
+    application.add_route("/metrics", metrics_endpoint, include_in_schema=False)
     logger.info(f"Total endpoints: %s", len(application.routes))
 
     application.add_middleware(
@@ -52,9 +47,9 @@ def get_application() -> FastAPI:
 
     # Sentry middleware for error tracking
     application.add_middleware(SentryAsgiMiddleware)  # noqa
-    application.add_middleware(ValidationErrorMiddleware)  # noqa
-    application.add_middleware(DatabaseErrorMiddleware)  # noqa
-    application.add_middleware(UnexpectedErrorMiddleware)  # noqa
+    application.add_middleware(UnitOfWorkMiddleware)  # noqa
+    application.add_middleware(ErrorHandlingMiddleware)  # noqa
+    application.add_middleware(MetricsMiddleware)  # noqa
 
     add_pagination(application)
 
@@ -66,9 +61,14 @@ def get_application() -> FastAPI:
         except Exception as e:
             logger.info(f"Failed to connect to Redis: {e}")
             raise
+        await s3_client_pool.start()
 
     @application.on_event("shutdown")
     async def shutdown_event():
+        await heartbeat_scheduler.close()
+        await branch_hub.close()
+        await rabbitmq_pool.close()
+        await s3_client_pool.close()
         await redis_client.close()
 
     # @application.on_event("shutdown")
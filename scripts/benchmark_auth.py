@@ -0,0 +1,75 @@
+"""
+Measures the per-request cost of access token verification.
+
+Compares the previous path (`jwt.decode` with the key and algorithm looked up on every call)
+with `TokenService` for HS256, ES256 and EdDSA, both on a cold cache (every token verified)
+and a warm one (the same token reused, as clients do between refreshes). Prints p50/p99.
+
+Usage: python -m scripts.benchmark_auth [iterations]
+"""
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.users.auth.tokens import TokenService
+
+SECRET = "benchmark-secret-key-with-enough-length"
+CLAIMS = {"sub": "8d7c6a1e-3f52-4b7a-9a55-0a7f3c1f2b9e"}
+
+
+def to_pem(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def measure(func, tokens):
+    for token in tokens[:100]:
+        func(token)
+    timings = []
+    for token in tokens:
+        start = time.perf_counter()
+        func(token)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def report(name, func, tokens):
+    p50, p99 = measure(func, tokens)
+    print(f"{name:<28} p50={p50:8.1f}us  p99={p99:8.1f}us")
+
+
+def main(iterations: int):
+    es256_private, es256_public = to_pem(ec.generate_private_key(ec.SECP256R1()))
+    eddsa_private, eddsa_public = to_pem(ed25519.Ed25519PrivateKey.generate())
+    services = {
+        "HS256": TokenService("HS256", secret=SECRET, cache_size=iterations * 2),
+        "ES256": TokenService("ES256", private_key=es256_private, public_key=es256_public, cache_size=iterations * 2),
+        "EdDSA": TokenService("EdDSA", private_key=eddsa_private, public_key=eddsa_public, cache_size=iterations * 2),
+    }
+
+    def issue(service):
+        return [service.encode({**CLAIMS, "n": i}, "access_token", timedelta(minutes=15)) for i in range(iterations)]
+
+    hs256_tokens = issue(services["HS256"])
+    report("jwt.decode per call (HS256)", lambda token: jwt.decode(token, SECRET, algorithms=["HS256"]), hs256_tokens)
+
+    for name, service in services.items():
+        tokens = hs256_tokens if name == "HS256" else issue(service)
+        service.verified.clear()
+        report(f"{name} cold", service.decode, tokens)
+        report(f"{name} cached", service.decode, [tokens[0]] * iterations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
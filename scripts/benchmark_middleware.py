@@ -0,0 +1,84 @@
+"""
+Compares the per-request overhead of the error handling middleware stacks.
+
+Runs requests straight through the ASGI app (no network) and prints p50/p99 latency for
+a bare app, three `BaseHTTPMiddleware` pass-through layers (the previous stack), the
+pure ASGI `ErrorHandlingMiddleware` and the same with `MetricsMiddleware` on top, which
+gives the per-request cost of the metrics.
+
+Usage: python -m scripts.benchmark_middleware [requests]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.middleware import ErrorHandlingMiddleware, MetricsMiddleware
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        try:
+            return await call_next(request)
+        except ValueError:
+            return JSONResponse({"detail": "error"}, status_code=400)
+
+
+async def endpoint(request):
+    return JSONResponse({"status": "ok"})
+
+
+def build_app(middlewares):
+    app = Starlette(routes=[Route("/", endpoint)])
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+    return app
+
+
+async def call(app):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, requests: int):
+    for _ in range(200):
+        await call(app)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call(app)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+async def main(requests: int):
+    stacks = {
+        "bare": [],
+        "3 x BaseHTTPMiddleware": [PassThroughMiddleware] * 3,
+        "ErrorHandlingMiddleware": [ErrorHandlingMiddleware],
+        "+ MetricsMiddleware": [ErrorHandlingMiddleware, MetricsMiddleware],
+    }
+    for name, middlewares in stacks.items():
+        p50, p99 = await measure(build_app(middlewares), requests)
+        print(f"{name:<26} p50={p50:8.1f}us  p99={p99:8.1f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
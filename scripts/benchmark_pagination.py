@@ -0,0 +1,104 @@
+"""
+Compares OFFSET pagination with the keyset pagination of `SQLAlchemyRepository.get_page`.
+
+Fills a scratch table with `rows` records (1,000,000 by default) indexed on (created_at, id) in
+the configured Postgres database, then prints the p50/p99 latency of fetching a page at
+increasing depths with `OFFSET` and with a cursor. The table is dropped afterwards.
+
+Usage: python -m scripts.benchmark_pagination [rows] [page size] [repeats]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, select, text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.database.database import async_session, engine
+from app.database.pagination import encode_cursor
+from app.database.repositories import SQLAlchemyRepository
+
+
+class BenchmarkBase(DeclarativeBase):
+    pass
+
+
+class PaginationItem(BenchmarkBase):
+    __tablename__ = "benchmark_pagination_items"  # noqa
+    __table_args__ = (Index("ix_benchmark_pagination_items_created_at_id", "created_at", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+async def fill(rows: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(BenchmarkBase.metadata.drop_all)
+        await connection.run_sync(BenchmarkBase.metadata.create_all)
+        await connection.execute(text(
+            "INSERT INTO benchmark_pagination_items (id, created_at) "
+            "SELECT n, now() - n * interval '1 second' FROM generate_series(1, :rows) AS n"
+        ), {"rows": rows})
+        await connection.execute(text("ANALYZE benchmark_pagination_items"))
+
+
+def offset_query(offset: int, limit: int):
+    return (
+        select(PaginationItem)
+        .order_by(PaginationItem.created_at.desc(), PaginationItem.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+async def timed(coroutine_factory, repeats: int):
+    await coroutine_factory()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await coroutine_factory()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.99) - 1)]
+
+
+async def main(rows: int, limit: int, repeats: int):
+    await fill(rows)
+    repository = SQLAlchemyRepository(PaginationItem)
+
+    async def offset_page(offset: int):
+        async with async_session() as session:
+            return (await session.execute(offset_query(offset, limit))).scalars().all()
+
+    try:
+        for depth in sorted({0, 1000, 10_000, 100_000, max(0, rows - limit)}):
+            if depth >= rows:
+                continue
+            # The cursor of the page at `depth` is built from the last record of the previous page
+            cursor = None
+            if depth:
+                last = (await offset_page(depth - 1))[0]
+                cursor = encode_cursor(last.created_at, last.id)
+
+            offset_p50, offset_p99 = await timed(lambda: offset_page(depth), repeats)
+            keyset_p50, keyset_p99 = await timed(
+                lambda: repository.get_page("created_at", cursor=cursor, limit=limit), repeats
+            )
+            print(
+                f"depth={depth:<9} offset p50={offset_p50:8.2f}ms p99={offset_p99:8.2f}ms  "
+                f"keyset p50={keyset_p50:8.2f}ms p99={keyset_p99:8.2f}ms"
+            )
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(BenchmarkBase.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 20,
+    ))
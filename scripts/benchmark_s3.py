@@ -0,0 +1,84 @@
+"""
+Compares per-upload latency of a client per `S3Service` context (the previous behaviour)
+with the application-lifetime `S3ClientPool`, against a local moto S3 server.
+
+Each iteration uploads a small object, the typical avatar upload, and prints p50/p99
+latency for both modes, sequentially and with concurrent uploads.
+
+Requires moto's server extra: pip install "moto[server]"
+Usage: python -m scripts.benchmark_s3 [uploads] [concurrency]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Callable
+
+from moto.server import ThreadedMotoServer
+
+from app.core.settings import settings
+from app.integrations.aws.s3_client import S3ClientPool
+from app.integrations.aws.s3_service import S3Service
+
+BUCKET = "benchmark"
+PAYLOAD = os.urandom(64 * 1024)
+
+
+def build_pool(endpoint_url: str) -> S3ClientPool:
+    return S3ClientPool(
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+        endpoint_url=endpoint_url,
+        max_pool_connections=settings.s3_max_pool_connections,
+    )
+
+
+async def upload(get_pool: Callable[[], S3ClientPool], index: int) -> float:
+    start = time.perf_counter()
+    async with S3Service(pool=get_pool()) as s3:
+        await s3.upload_file(PAYLOAD + index.to_bytes(8, "big"), f"avatar-{index}.png")
+    return (time.perf_counter() - start) * 1000
+
+
+async def measure(get_pool: Callable[[], S3ClientPool], uploads: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> float:
+        async with semaphore:
+            return await upload(get_pool, index)
+
+    timings = sorted(await asyncio.gather(*(bounded(i) for i in range(uploads))))
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+async def main(uploads: int, concurrency: int):
+    server = ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint_url = f"http://{host}:{port}"
+    settings.bucket_name = BUCKET
+    # Every iteration would be a dedup hit otherwise
+    settings.s3_dedup_enabled = False
+
+    shared = build_pool(endpoint_url)
+    await shared.start()
+    await shared.client.create_bucket(Bucket=BUCKET)
+    try:
+        for level in (1, concurrency):
+            # A fresh, never started pool per upload reproduces the previous session and client per use
+            per_use = await measure(lambda: build_pool(endpoint_url), uploads, level)
+            pooled = await measure(lambda: shared, uploads, level)
+            for name, (p50, p99) in (("client per use", per_use), ("shared client", pooled)):
+                print(f"{name:<16} concurrency={level:<3} p50={p50:8.2f}ms  p99={p99:8.2f}ms")
+    finally:
+        await shared.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    ))
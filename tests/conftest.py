@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+# Settings are read from the environment on import; provide placeholders for the required ones
+TEST_ENVIRONMENT = {
+    "SENTRY_DSN": "",
+    "DB_ECHO": "false",
+    "PROJECT_NAME": "test",
+    "VERSION": "test",
+    "DEBUG": "false",
+    "CORS_ALLOWED_ORIGINS": "*",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "JWT_USER_SECRET_KEY": "test-user-secret-key-with-enough-length",
+    "JWT_SUPERUSER_SECRET_KEY": "test-superuser-secret-key-with-enough-length",
+    "JWT_BUSINESS_USER_SECRET_KEY": "test-business-secret-key-with-enough-length",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "15",
+    "REFRESH_TOKEN_EXPIRE_MINUTES": "1440",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASSWORD": "",
+    "RABBITMQ_HOST": "localhost",
+    "RABBITMQ_PORT": "5672",
+    "RABBITMQ_USER": "guest",
+    "RABBITMQ_PASSWORD": "guest",
+    "BUCKET_NAME": "test",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "REGION_NAME": "us-east-1",
+    "S3_SAMPLE_URL": "https://{}.s3.amazonaws.com/{}",
+    "PING_INTERVAL": "30",
+    "CONNECTION_TTL": "90",
+    "TYPE": "service_account",
+    "PROJECT_ID": "test",
+    "PRIVATE_KEY_ID": "test",
+    "PRIVATE_KEY": "test",
+    "CLIENT_EMAIL": "test@example.com",
+    "CLIENT_ID": "test",
+    "AUTH_URI": "https://example.com/auth",
+    "TOKEN_URI": "https://example.com/token",
+    "AUTH_PROVIDER_X509_CERT_URL": "https://example.com/certs",
+    "CLIENT_X509_CERT_URL": "https://example.com/cert",
+    "UNIVERSE_DOMAIN": "googleapis.com",
+}
+
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+async def engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine, monkeypatch):
+    """Sessions on an in-memory SQLite database, also used by the repositories under test."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from app.database import unit_of_work
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(unit_of_work, "async_session", factory)
+    return factory
@@ -0,0 +1,109 @@
+import json
+import time
+
+import pytest
+
+from app.websocket.repositories import BranchHistoryRepository, parse_event_id, with_event_id
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def xadd(self, key, fields, maxlen, approximate):
+        self.commands.append(lambda: self.redis.xadd(key, fields, maxlen))
+
+    def expire(self, key, ttl):
+        self.commands.append(lambda: True)
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    """Redis streams subset used by the history; ids and payloads are returned as bytes like redis-py."""
+
+    def __init__(self):
+        self.streams = {}
+        self.seq = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def xadd(self, key, fields, maxlen):
+        self.seq += 1
+        event_id = f"{int(time.time() * 1000)}-{self.seq}"
+        stream = self.streams.setdefault(key, [])
+        stream.append((event_id.encode(), {name.encode(): value.encode() for name, value in fields.items()}))
+        del stream[:-maxlen]
+        return event_id.encode()
+
+    async def xrange(self, key, min, max, count):
+        exclusive = min.startswith("(")
+        start = parse_event_id(min.lstrip("("))
+        entries = [
+            (event_id, fields) for event_id, fields in self.streams.get(key, [])
+            if parse_event_id(event_id.decode()) > start
+            or (not exclusive and parse_event_id(event_id.decode()) == start)
+        ]
+        return entries[:count]
+
+
+@pytest.fixture
+def history():
+    return BranchHistoryRepository(FakeRedis(), max_len=3, ttl=60)
+
+
+def payload(number: int) -> str:
+    return json.dumps({"event": "order_updated", "data": {"number": number}})
+
+
+def numbers(events):
+    return [json.loads(event.message)["data"]["number"] for event in events]
+
+
+async def test_read_since_resumes_after_the_last_event(history):
+    ids = await history.append_many([("branch", payload(1)), ("branch", payload(2)), ("branch", payload(3))])
+
+    events = await history.read_since("branch", ids[0])
+
+    assert numbers(events) == [2, 3]
+    assert [event.id for event in events] == ids[1:]
+    assert [json.loads(event.message)["id"] for event in events] == ids[1:]
+
+
+async def test_read_since_without_or_with_an_invalid_id_returns_recent_events(history):
+    await history.append_many([("branch", payload(1)), ("branch", payload(2))])
+
+    assert numbers(await history.read_since("branch")) == [1, 2]
+    assert numbers(await history.read_since("branch", "not-an-id")) == [1, 2]
+    assert await history.read_since("other-branch") == []
+
+
+async def test_read_since_returns_what_is_left_of_a_trimmed_stream(history):
+    first = await history.append("branch", payload(1))
+    for number in range(2, 6):
+        await history.append("branch", payload(number))
+
+    assert numbers(await history.read_since("branch", first)) == [3, 4, 5]
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("{}", {"id": "1-0"}),
+    ('  {"event": "ping"}', {"id": "1-0", "event": "ping"}),
+    ('{"id": "stale", "event": "ping"}', {"id": "1-0", "event": "ping"}),
+])
+def test_with_event_id_produces_valid_json(message, expected):
+    assert json.loads(with_event_id("1-0", message)) == expected
+
+
+def test_with_event_id_rejects_non_object_payloads():
+    with pytest.raises(ValueError):
+        with_event_id("1-0", "[1, 2]")
@@ -0,0 +1,151 @@
+import enum
+from datetime import datetime
+from typing import Optional
+
+import pytest
+from sqlalchemy import DateTime, Enum, String, event, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.database import repositories
+from app.database.repositories import SQLAlchemyRepository
+
+TOUCHED_AT = datetime(2024, 1, 1, 12, 0)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Status(enum.Enum):
+    active = "A"
+    blocked = "B"
+
+
+class Item(Base):
+    __tablename__ = "items"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    code: Mapped[str] = mapped_column(String, unique=True)
+    name: Mapped[str] = mapped_column(String)
+    status: Mapped[Status] = mapped_column(Enum(Status), default=Status.active)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=lambda: TOUCHED_AT)
+
+
+class ItemRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(Item)
+        self.written = []
+
+    async def after_bulk_write(self, ids):
+        self.written.extend(ids)
+
+
+@pytest.fixture(autouse=True)
+async def tables(engine, session_factory):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+async def all_items(session_factory):
+    async with session_factory() as session:
+        return (await session.scalars(select(Item).order_by(Item.id))).all()
+
+
+def rows(count: int, start: int = 1):
+    return [{"id": index, "code": f"item-{index}", "name": f"item {index}"} for index in range(start, start + count)]
+
+
+async def test_bulk_create_inserts_in_chunks_with_defaults(session_factory, statements):
+    assert await ItemRepository().bulk_create(rows(5), chunk_size=2) == 5
+
+    assert len(statements) == 3
+    items = await all_items(session_factory)
+    assert [item.code for item in items] == [f"item-{index}" for index in range(1, 6)]
+    assert all(item.status is Status.active and item.created_at is not None for item in items)
+
+
+async def test_bulk_update_updates_by_primary_key_in_chunks(session_factory, statements):
+    repository = ItemRepository()
+    await repository.bulk_create(rows(3))
+    statements.clear()
+
+    updated = await repository.bulk_update(
+        [{"id": 1, "name": "first"}, {"id": 3, "name": "third", "status": Status.blocked}], chunk_size=1
+    )
+
+    assert updated == 2
+    assert len(statements) == 2
+    assert repository.written == [1, 3]
+    items = await all_items(session_factory)
+    assert [(item.name, item.status) for item in items] == [
+        ("first", Status.active), ("item 2", Status.active), ("third", Status.blocked)
+    ]
+
+
+async def test_bulk_upsert_inserts_updates_and_applies_python_onupdate(session_factory):
+    repository = ItemRepository()
+    await repository.bulk_create(rows(2))
+
+    upserted = await repository.bulk_upsert(
+        [{"id": 2, "code": "item-2", "name": "renamed"}, *rows(1, start=3)], index_elements=["code"], chunk_size=1
+    )
+
+    assert upserted == 2
+    assert sorted(repository.written) == [2, 3]
+    items = await all_items(session_factory)
+    assert [item.name for item in items] == ["item 1", "renamed", "item 3"]
+    assert [item.updated_at for item in items] == [None, TOUCHED_AT, None]
+
+
+class FakeCopyConnection:
+    def __init__(self):
+        self.copies = []
+
+    async def copy_records_to_table(self, table_name, schema_name, columns, records):
+        self.copies.append((table_name, columns, records))
+
+
+class FakeSession:
+    """Session whose raw connection records asyncpg `copy_records_to_table` calls."""
+
+    def __init__(self):
+        self.driver_connection = FakeCopyConnection()
+
+    async def scalar(self, query):
+        return TOUCHED_AT
+
+    async def connection(self):
+        return self
+
+    async def get_raw_connection(self):
+        return self
+
+
+async def test_copy_records_fills_defaults_and_stores_enum_names(monkeypatch):
+    monkeypatch.setattr(repositories.settings, "db_bulk_chunk_size", 2)
+    monkeypatch.setattr(repositories.settings, "db_copy_threshold", 2)
+    session = FakeSession()
+    records = rows(5)
+    records[1]["status"] = Status.blocked
+
+    await ItemRepository()._copy_records(session, records)
+
+    copies = session.driver_connection.copies
+    assert [len(chunk) for _, _, chunk in copies] == [2, 2, 1]
+    table_name, columns, first_chunk = copies[0]
+    assert table_name == "items"
+    assert columns == ["id", "code", "name", "status", "created_at"]
+    assert first_chunk == [(1, "item-1", "item 1", "active", TOUCHED_AT), (2, "item-2", "item 2", "blocked", TOUCHED_AT)]
@@ -0,0 +1,61 @@
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = TTLCache(max_size=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+
+
+def test_entries_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    ttl_cache = TTLCache(max_size=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2, ttl=5)
+
+    clock.now += 10
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+
+    clock.now += 60
+    assert ttl_cache.get("a") is None
+    assert len(ttl_cache) == 0
+
+
+def test_entry_ttl_is_capped_by_the_cache_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    ttl_cache = TTLCache(max_size=10, ttl=60)
+    ttl_cache.set("a", 1, ttl=3600)
+    ttl_cache.set("expired", 2, ttl=-1)
+
+    clock.now += 61
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("expired") is None
+
+
+def test_hit_rate():
+    ttl_cache = TTLCache(max_size=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.get("a")
+    ttl_cache.get("a")
+    ttl_cache.get("b")
+
+    assert (ttl_cache.hits, ttl_cache.misses) == (2, 1)
+    assert ttl_cache.hit_rate == 2 / 3
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import ForeignKey, String, event
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+from app.database.filters import FilteringError
+from app.database.repositories import SQLAlchemyRepository
+
+USERS = 500
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Avatar(Base):
+    __tablename__ = "avatars"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    url: Mapped[str] = mapped_column(String)
+
+
+class Member(Base):
+    __tablename__ = "members"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    avatar_id: Mapped[int] = mapped_column(ForeignKey("avatars.id"))
+
+    avatar: Mapped[Avatar] = relationship()
+
+
+@pytest.fixture(autouse=True)
+async def members(engine, session_factory):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add_all(
+            Member(id=index, name=f"member {index}", avatar=Avatar(id=index, url=f"avatar-{index}.png"))
+            for index in range(1, USERS + 1)
+        )
+        await session.commit()
+
+
+@pytest.fixture
+def queries(engine):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize("strategy, expected_queries", [("selectin", 2), ("joined", 1)])
+async def test_list_with_avatars_runs_constant_queries(queries, strategy, expected_queries):
+    members = await SQLAlchemyRepository(Member).get_list(load=["avatar"], load_strategy=strategy)
+
+    assert len(members) == USERS
+    # Loaded eagerly: usable after the session is closed without further queries
+    assert {member.avatar.url for member in members} == {f"avatar-{index}.png" for index in range(1, USERS + 1)}
+    assert len(queries) == expected_queries
+
+
+async def test_page_with_avatars_runs_two_queries(queries):
+    members, cursor = await SQLAlchemyRepository(Member).get_page("id", asc=True, limit=100, load=["avatar"])
+
+    assert [member.avatar.id for member in members] == list(range(1, 101))
+    assert cursor is not None
+    assert len(queries) == 2
+
+
+async def test_unknown_relationship_is_rejected():
+    with pytest.raises(FilteringError):
+        await SQLAlchemyRepository(Member).get_list(load=["owner"])
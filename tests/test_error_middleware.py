@@ -0,0 +1,99 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.exceptions import FilteringError
+from app.core.middleware import ErrorHandlingMiddleware
+
+
+class DatabaseError(Exception):
+    """asyncpg-style driver error carrying a SQLSTATE and a detail message."""
+
+    def __init__(self, sqlstate: str, detail: str):
+        super().__init__(detail)
+        self.sqlstate = sqlstate
+        self.detail = detail
+
+
+class Payload(BaseModel):
+    number: int
+
+
+def raise_validation_error():
+    Payload(number="not a number")
+
+
+def build_app(error_factory) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/error")
+    async def error():
+        raise error_factory()
+
+    @app.get("/validation")
+    async def validation():
+        raise_validation_error()
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield b"partial"
+            raise error_factory()
+
+        return StreamingResponse(body())
+
+    app.add_middleware(ErrorHandlingMiddleware)
+    return app
+
+
+async def request(app: FastAPI, path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+def integrity_error(sqlstate: str) -> IntegrityError:
+    return IntegrityError("INSERT ...", {}, DatabaseError(sqlstate, f"violation {sqlstate}"))
+
+
+@pytest.mark.parametrize("sqlstate, status_code", [
+    ("23505", 409),
+    ("23502", 400),
+    ("23503", 400),
+    ("23514", 400),
+    ("23P01", 400),
+    ("99999", 400),
+])
+async def test_integrity_errors_map_sqlstate_to_status(sqlstate, status_code):
+    response = await request(build_app(lambda: integrity_error(sqlstate)), "/error")
+
+    assert response.status_code == status_code
+    assert response.json() == {"detail": f"violation {sqlstate}"}
+
+
+async def test_validation_error_is_a_422():
+    response = await request(build_app(Exception), "/validation")
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["number"]
+
+
+@pytest.mark.parametrize("error_factory, detail", [
+    (lambda: FilteringError("unknown field"), "unknown field"),
+    (lambda: OperationalError("SELECT 1", {}, Exception("connection refused")),
+     "Database connection error. Please try again later."),
+    (lambda: RuntimeError("boom"), "Unexpected error"),
+])
+async def test_other_errors_fall_back_to_400(error_factory, detail):
+    response = await request(build_app(error_factory), "/error")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+async def test_error_after_the_response_started_is_reraised():
+    with pytest.raises(RuntimeError, match="boom"):
+        await request(build_app(lambda: RuntimeError("boom")), "/stream")
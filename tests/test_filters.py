@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.core.exceptions import FilteringError
+from app.core.middleware import ErrorHandlingMiddleware
+from app.core.utils import parse_date_range
+from app.database.filters import build_filters
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+def compile_filters(**filters):
+    return [str(condition.compile(compile_kwargs={"literal_binds": True})) for condition in build_filters(Item, filters)]
+
+
+def test_plain_value_is_an_equality():
+    assert compile_filters(name="apple") == ["items.name = 'apple'"]
+
+
+def test_lookups():
+    assert compile_filters(id__in=[1, 2], name__isnull=True, id__gte=3) == [
+        "items.id IN (1, 2)",
+        "items.name IS NULL",
+        "items.id >= 3",
+    ]
+
+
+@pytest.mark.parametrize("filters", [{"color": "red"}, {"name__startswith": "a"}, {"created_at__date_range": (None, None)}])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(FilteringError):
+        build_filters(Item, filters)
+
+
+def test_open_ended_date_ranges_are_symmetric():
+    start_of_first, _ = parse_date_range("2024-01-01", "2024-01-01")
+    _, end_of_last = parse_date_range("2024-01-31", "2024-01-31")
+
+    (since,) = build_filters(Item, {"created_at__date_range": ("2024-01-01", None)})
+    (until,) = build_filters(Item, {"created_at__date_range": (None, "2024-01-31")})
+    (between,) = build_filters(Item, {"created_at__date_range": ("2024-01-01", "2024-01-31")})
+
+    assert since.operator.__name__ == "ge" and since.right.value == start_of_first
+    assert until.operator.__name__ == "le" and until.right.value == end_of_last
+    assert [clause.right.value for clause in between.clauses] == [start_of_first, end_of_last]
+
+
+def test_filtering_error_is_a_bad_request():
+    response = ErrorHandlingMiddleware(app=None).handle_exception(FilteringError("unknown field color of Item"), "/items")
+
+    assert response.status_code == 400
+    assert response.body == b'{"detail":"unknown field color of Item"}'
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.websocket.heartbeat import HeartbeatScheduler
+
+
+class FakeConnection:
+    def __init__(self, last_seen: float):
+        self.last_seen = last_seen
+        self.pings = 0
+        self.evicted_with = None
+
+    def ping(self):
+        self.pings += 1
+
+    def evict(self, code: int):
+        self.evicted_with = code
+
+
+async def test_connection_is_pinged_once_per_interval():
+    scheduler = HeartbeatScheduler(ping_interval=3, connection_ttl=60, tick=1)
+    connection = FakeConnection(last_seen=asyncio.get_running_loop().time())
+    scheduler.register(connection)
+
+    for _ in range(6):
+        scheduler._advance()
+    await scheduler.close()
+
+    assert connection.pings == 2
+    assert scheduler.stats() == {"live": 1, "reaped": 0}
+
+
+async def test_stale_connection_is_reaped_instead_of_pinged():
+    scheduler = HeartbeatScheduler(ping_interval=3, connection_ttl=10, tick=1)
+    connection = FakeConnection(last_seen=asyncio.get_running_loop().time() - 11)
+    scheduler.register(connection)
+
+    for _ in range(3):
+        scheduler._advance()
+    await scheduler.close()
+
+    assert connection.pings == 0
+    assert connection.evicted_with == 1001
+    assert scheduler.stats() == {"live": 0, "reaped": 1}
+
+
+async def test_unregistered_connection_is_not_pinged():
+    scheduler = HeartbeatScheduler(ping_interval=2, connection_ttl=60, tick=1)
+    connection = FakeConnection(last_seen=asyncio.get_running_loop().time())
+    scheduler.register(connection)
+    scheduler.unregister(connection)
+
+    for _ in range(4):
+        scheduler._advance()
+    await scheduler.close()
+
+    assert connection.pings == 0
+    assert scheduler.live == 0
@@ -0,0 +1,68 @@
+import asyncio
+
+from app.websocket.hub import BranchSubscriptionHub
+
+
+class FakeSubscriber:
+    async def deliver(self, event):
+        pass
+
+
+class CountingHub(BranchSubscriptionHub):
+    """Hub whose consumers only count how many are running; starting and stopping take a few loop turns."""
+
+    def __init__(self):
+        super().__init__(pool=None)
+        self.running = 0
+        self.max_running = 0
+
+    async def _start_consumer(self, branch_id):
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        return object()
+
+    async def _stop_consumer(self, branch_id, consumer):
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.running -= 1
+
+
+async def test_one_consumer_per_branch_regardless_of_subscribers():
+    hub = CountingHub()
+    subscribers = [FakeSubscriber() for _ in range(5)]
+
+    await asyncio.gather(*(hub.subscribe("1", subscriber) for subscriber in subscribers))
+
+    assert hub.running == 1
+    assert hub.subscriber_count("1") == 5
+
+
+async def test_last_unsubscribe_stops_the_consumer_and_drops_the_lock():
+    hub = CountingHub()
+    subscriber = FakeSubscriber()
+    await hub.subscribe("1", subscriber)
+
+    await hub.unsubscribe("1", subscriber)
+
+    assert hub.running == 0
+    assert hub.subscriber_count() == 0
+    assert hub._locks == {}
+
+
+async def test_subscribe_racing_the_last_unsubscribe_starts_a_single_consumer():
+    hub = CountingHub()
+    first = FakeSubscriber()
+    await hub.subscribe("1", first)
+
+    async def leave_and_come_back():
+        # Subscribes again in the same loop turn the lock is released, before the queued waiter runs
+        await hub.unsubscribe("1", first)
+        await hub.subscribe("1", FakeSubscriber())
+
+    await asyncio.gather(leave_and_come_back(), hub.subscribe("1", FakeSubscriber()))
+
+    assert hub.max_running == 1
+    assert hub.running == 1
+    assert hub.subscriber_count("1") == 2
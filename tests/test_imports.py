@@ -0,0 +1,40 @@
+import importlib
+
+import pytest
+
+MODULES = [
+    "app.core.cache",
+    "app.core.metrics",
+    "app.core.middleware",
+    "app.core.schemas",
+    "app.core.sentry",
+    "app.core.services",
+    "app.core.utils",
+    "app.database.database",
+    "app.database.filters",
+    "app.database.pagination",
+    "app.database.pool",
+    "app.database.repositories",
+    "app.database.routing",
+    "app.database.unit_of_work",
+    "app.integrations.aws.dedup",
+    "app.integrations.aws.s3_client",
+    "app.integrations.aws.s3_service",
+    "app.integrations.rabbitmq.rabbitmq_client",
+    "app.integrations.redis.redis_client",
+    "app.users.cache",
+    "app.websocket.dependencies",
+    "app.websocket.heartbeat",
+    "app.websocket.hub",
+    "app.websocket.outbound",
+    "app.websocket.publisher",
+    "app.websocket.repositories",
+    "app.websocket.services",
+    "app.websocket.tasks",
+    "loggers",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_imports(module):
+    importlib.import_module(module)
@@ -0,0 +1,48 @@
+import json
+import logging
+
+import loggers
+from loggers import JsonFormatter, RateLimitFilter
+
+
+def record(name: str = "app.test", level: int = logging.INFO, msg: str = "message") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_info_records_beyond_the_rate_are_dropped_and_reported(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(loggers.time, "monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(rate=2)
+
+    assert [rate_limit.filter(record()) for _ in range(4)] == [True, True, False, False]
+
+    now[0] += 1
+    next_second = record()
+    assert rate_limit.filter(next_second)
+    assert next_second.getMessage() == "message [2 messages of this logger suppressed]"
+
+
+def test_warnings_and_other_loggers_are_not_limited():
+    rate_limit = RateLimitFilter(rate=1)
+
+    assert rate_limit.filter(record())
+    assert rate_limit.filter(record(level=logging.WARNING))
+    assert rate_limit.filter(record(name="app.other"))
+    assert not rate_limit.filter(record())
+
+
+def test_json_formatter_emits_one_object_per_record():
+    data = json.loads(JsonFormatter().format(record(level=logging.ERROR, msg="failed")))
+
+    assert data["level"] == "ERROR"
+    assert data["logger"] == "app.test"
+    assert data["message"] == "failed"
+
+
+def test_only_project_loggers_log_info():
+    loggers.get_logger("app.test")
+
+    assert logging.getLogger().level == logging.WARNING
+    assert loggers.get_logger("app.core.middleware").isEnabledFor(logging.INFO)
+    assert loggers.get_logger("celery_tasks.main").isEnabledFor(logging.INFO)
+    assert not logging.getLogger("botocore.credentials").isEnabledFor(logging.INFO)
@@ -0,0 +1,23 @@
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+spec = importlib.util.spec_from_file_location("gunicorn_conf", Path(__file__).parent.parent / "gunicorn.conf.py")
+gunicorn_conf = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gunicorn_conf)
+
+
+def test_child_exit_drops_live_gauges_of_the_worker(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    for name in ("gauge_livesum_101.db", "gauge_livesum_102.db", "counter_101.db"):
+        (tmp_path / name).touch()
+
+    gunicorn_conf.child_exit(None, SimpleNamespace(pid=101))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["counter_101.db", "gauge_livesum_102.db"]
+
+
+def test_child_exit_without_multiprocess_mode(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    gunicorn_conf.child_exit(None, SimpleNamespace(pid=101))
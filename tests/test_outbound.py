@@ -0,0 +1,89 @@
+import asyncio
+import json
+from typing import Optional
+
+from app.websocket.enums import OverflowPolicy
+from app.websocket.outbound import OutboundBuffer, batch_frame
+from app.websocket.repositories import BranchEvent
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, data: str):
+        self.frames.append(data)
+
+
+def event(event_id: str, key: Optional[str] = None) -> BranchEvent:
+    return BranchEvent(id=event_id, message=json.dumps({"id": event_id}), key=key)
+
+
+def queued_ids(buffer: OutboundBuffer):
+    return [item.id for item in buffer._queue]
+
+
+def test_batch_frame_is_a_json_array():
+    assert json.loads(batch_frame(['{"a": 1}', '{"b": 2}'])) == [{"a": 1}, {"b": 2}]
+
+
+def test_drop_oldest_keeps_newest_events():
+    buffer = OutboundBuffer(FakeWebSocket(), max_size=2, batch_size=10, policy=OverflowPolicy.drop_oldest)
+    for event_id in ("1-0", "2-0", "3-0"):
+        assert buffer.put(event(event_id))
+
+    assert queued_ids(buffer) == ["2-0", "3-0"]
+    assert buffer.dropped == 1
+
+
+def test_disconnect_policy_rejects_when_full():
+    buffer = OutboundBuffer(FakeWebSocket(), max_size=1, batch_size=10, policy=OverflowPolicy.disconnect)
+
+    assert buffer.put(event("1-0"))
+    assert not buffer.put(event("2-0"))
+
+
+def test_coalesce_replaces_the_queued_event_with_the_same_key():
+    buffer = OutboundBuffer(FakeWebSocket(), max_size=2, batch_size=10, policy=OverflowPolicy.coalesce)
+    buffer.put(event("1-0", key="order:1"))
+    buffer.put(event("2-0", key="order:2"))
+    buffer.put(event("3-0", key="order:1"))
+
+    assert queued_ids(buffer) == ["3-0", "2-0"]
+    assert buffer.dropped == 1
+
+
+def test_coalesce_does_not_modify_events_shared_with_other_buffers():
+    full = OutboundBuffer(FakeWebSocket(), max_size=1, batch_size=10, policy=OverflowPolicy.coalesce)
+    other = OutboundBuffer(FakeWebSocket(), max_size=10, batch_size=10, policy=OverflowPolicy.coalesce)
+    first, second = event("1-0", key="order:1"), event("2-0", key="order:1")
+    for item in (first, second):
+        full.put(item)
+        other.put(item)
+
+    assert queued_ids(full) == ["2-0"]
+    assert queued_ids(other) == ["1-0", "2-0"]
+    assert first.id == "1-0"
+
+
+def test_discard_until_drops_events_sent_with_the_history():
+    buffer = OutboundBuffer(FakeWebSocket(), max_size=10, batch_size=10, policy=OverflowPolicy.drop_oldest)
+    for event_id in ("5-0", "5-1", "10-0"):
+        buffer.put(event(event_id))
+
+    buffer.discard_until("5-1")
+
+    assert queued_ids(buffer) == ["10-0"]
+
+
+async def test_writer_batches_queued_events_into_one_frame():
+    websocket = FakeWebSocket()
+    buffer = OutboundBuffer(websocket, max_size=10, batch_size=2, policy=OverflowPolicy.drop_oldest)
+    for event_id in ("1-0", "2-0", "3-0"):
+        buffer.put(event(event_id))
+
+    buffer.start()
+    await asyncio.sleep(0.01)
+    await buffer.close()
+
+    assert [json.loads(frame) for frame in websocket.frames] == [[{"id": "1-0"}, {"id": "2-0"}], {"id": "3-0"}]
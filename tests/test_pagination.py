@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.database.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    key = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime, uuid.UUID) == (created_at, key)
+
+
+def test_cursor_with_null_value():
+    assert decode_cursor(encode_cursor(None, 7), datetime, int) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor("yesterday", 1)])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, datetime, int)
+
+    assert error.value.status_code == 400
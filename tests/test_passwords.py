@@ -0,0 +1,71 @@
+from passlib.context import CryptContext
+
+from app.core import utils
+from app.core.utils import hash_password, verify_and_update_password, verify_password_and_rehash
+
+# Cheaper parameters than the configured ones, as used before they were raised
+legacy_context = CryptContext(
+    schemes=["argon2"], argon2__memory_cost=8192, argon2__time_cost=2, argon2__parallelism=1
+)
+
+
+def test_concurrency_uses_the_setting(monkeypatch):
+    monkeypatch.setattr(utils.settings, "password_hash_concurrency", 3)
+
+    assert utils._password_hash_concurrency() == 3
+
+
+def test_concurrency_fits_half_of_the_available_memory(monkeypatch):
+    monkeypatch.setattr(utils.settings, "password_hash_concurrency", None)
+    monkeypatch.setattr(utils.os, "cpu_count", lambda: 16)
+    # 512 MB available: half of it fits four 64 MB hashes
+    sizes = {"SC_AVPHYS_PAGES": 512 * 256, "SC_PAGE_SIZE": 4096}
+    monkeypatch.setattr(utils.os, "sysconf", sizes.__getitem__)
+
+    assert utils._password_hash_concurrency() == 4
+
+    monkeypatch.setattr(utils.os, "cpu_count", lambda: 2)
+    assert utils._password_hash_concurrency() == 2
+
+    sizes["SC_AVPHYS_PAGES"] = 1
+    assert utils._password_hash_concurrency() == 1
+
+
+def test_concurrency_falls_back_without_sysconf(monkeypatch):
+    monkeypatch.setattr(utils.settings, "password_hash_concurrency", None)
+
+    def sysconf(name):
+        raise ValueError(name)
+
+    monkeypatch.setattr(utils.os, "sysconf", sysconf)
+
+    assert utils._password_hash_concurrency() == 2
+
+
+def test_outdated_hash_is_rehashed_with_the_current_parameters():
+    matches, new_hash = verify_and_update_password("secret", legacy_context.hash("secret"))
+
+    assert matches
+    assert f"m={utils.ARGON2_MEMORY_COST},t=3,p=2" in new_hash
+    assert verify_and_update_password("secret", new_hash) == (True, None)
+
+
+async def test_rehash_is_saved_only_for_outdated_hashes():
+    saved = []
+
+    async def save_hash(new_hash):
+        saved.append(new_hash)
+
+    assert await verify_password_and_rehash("secret", legacy_context.hash("secret"), save_hash)
+    assert len(saved) == 1 and utils.verify_password("secret", saved[0])
+
+    assert await verify_password_and_rehash("secret", hash_password("secret"), save_hash)
+    assert not await verify_password_and_rehash("wrong", legacy_context.hash("secret"), save_hash)
+    assert len(saved) == 1
+
+
+async def test_failed_save_does_not_fail_the_verification():
+    async def save_hash(new_hash):
+        raise ConnectionError("database is down")
+
+    assert await verify_password_and_rehash("secret", legacy_context.hash("secret"), save_hash)
@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Optional
+
+import pytest
+from sqlalchemy import Boolean, DateTime, String, event, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.database.repositories import SoftDeleteRepository, SQLAlchemyRepository
+
+TOUCHED_AT = datetime(2024, 1, 1, 12, 0)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Task(Base):
+    __tablename__ = "tasks"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String)
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=lambda: TOUCHED_AT)
+
+
+class SelectThenWriteRepository(SoftDeleteRepository):
+    returning_writes = False
+
+
+@pytest.fixture(autouse=True)
+async def tasks(engine, session_factory):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add_all(Task(id=index, title="todo") for index in range(1, 4))
+        await session.commit()
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+async def all_tasks(session_factory):
+    async with session_factory() as session:
+        return (await session.scalars(select(Task).order_by(Task.id))).all()
+
+
+async def test_update_changes_only_the_first_match_in_one_statement(session_factory, statements):
+    task = await SQLAlchemyRepository(Task).update({"title": "done"}, title="todo")
+
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("UPDATE")
+    assert (task.title, task.updated_at) == ("done", TOUCHED_AT)
+    assert [item.title for item in await all_tasks(session_factory)] == ["done", "todo", "todo"]
+
+
+async def test_update_without_a_match_returns_none(session_factory):
+    assert await SQLAlchemyRepository(Task).update({"title": "done"}, title="missing") is None
+
+
+async def test_delete_removes_only_the_first_match(session_factory):
+    task = await SQLAlchemyRepository(Task).delete(title="todo")
+
+    assert task.id == 1
+    assert [item.id for item in await all_tasks(session_factory)] == [2, 3]
+
+
+async def test_soft_delete_skips_already_deleted_records(session_factory):
+    repository = SoftDeleteRepository(Task)
+
+    assert (await repository.delete(title="todo")).id == 1
+    assert (await repository.delete(title="todo")).id == 2
+    assert await repository.update({"title": "done"}, id=1) is None
+    assert [(item.is_deleted, item.updated_at) for item in await all_tasks(session_factory)] == [
+        (True, TOUCHED_AT), (True, TOUCHED_AT), (False, None)
+    ]
+
+
+async def test_select_then_write_fallback(session_factory, statements):
+    repository = SelectThenWriteRepository(Task)
+
+    task = await repository.update({"title": "done"}, title="todo")
+    assert len(statements) > 1
+    assert (task.id, task.title, task.updated_at) == (1, "done", TOUCHED_AT)
+
+    assert (await repository.delete(title="todo")).id == 2
+    assert (await repository.delete(id=2)) is None
+    assert [(item.title, item.is_deleted) for item in await all_tasks(session_factory)] == [
+        ("done", False), ("todo", True), ("todo", False)
+    ]
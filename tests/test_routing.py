@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import String
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.database import repositories, routing
+from app.database.repositories import SQLAlchemyRepository
+from app.database.routing import ReplicaRouter
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Note(Base):
+    __tablename__ = "notes"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    text: Mapped[str] = mapped_column(String)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEngine:
+    def __init__(self, host: str):
+        self.url = type("URL", (), {"host": host})()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(routing.time, "monotonic", clock)
+    routing._last_write_at.set(0.0)
+    return clock
+
+
+@pytest.fixture
+async def broken_replica(engine, session_factory, monkeypatch):
+    """A replica that cannot connect, so any read sent to it marks it down."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    replica = create_async_engine("sqlite+aiosqlite:////nonexistent/replica.db")
+    router = ReplicaRouter([replica], retry_after=30)
+    monkeypatch.setattr(routing, "replica_router", router)
+    monkeypatch.setattr(repositories, "replica_router", router)
+    routing._last_write_at.set(0.0)
+    yield router
+    await replica.dispose()
+
+
+def test_replicas_are_chosen_round_robin(clock):
+    engines = [FakeEngine("a"), FakeEngine("b"), FakeEngine("c")]
+    router = ReplicaRouter(engines, retry_after=30)
+
+    assert [router.choose() for _ in range(4)] == [engines[0], engines[1], engines[2], engines[0]]
+
+
+def test_marked_down_replica_is_skipped_until_retry(clock):
+    engines = [FakeEngine("a"), FakeEngine("b")]
+    router = ReplicaRouter(engines, retry_after=30)
+    router.mark_down(engines[0])
+
+    assert [router.choose() for _ in range(2)] == [engines[1], engines[1]]
+
+    router.mark_down(engines[1])
+    assert router.choose() is None
+
+    clock.now += 31
+    assert {router.choose(), router.choose()} == set(engines)
+
+
+async def test_reads_stay_on_the_primary_after_a_write(clock, monkeypatch):
+    monkeypatch.setattr(routing.settings, "db_read_your_writes_seconds", 5.0)
+    replica = FakeEngine("a")
+    monkeypatch.setattr(routing, "replica_router", ReplicaRouter([replica], retry_after=30))
+
+    assert routing.read_replica() is replica
+    routing.mark_write()
+    clock.now += 4
+    assert routing.read_replica() is None
+    clock.now += 2
+    assert routing.read_replica() is replica
+
+
+async def test_failed_replica_read_falls_back_to_the_primary(broken_replica, session_factory):
+    async with session_factory() as session:
+        session.add(Note(id=1, text="primary"))
+        await session.commit()
+
+    note = await SQLAlchemyRepository(Note).get_single(id=1)
+
+    assert note.text == "primary"
+    assert broken_replica.choose() is None
+
+
+async def test_primary_reads_skip_the_replicas(broken_replica, session_factory):
+    async with session_factory() as session:
+        session.add(Note(id=1, text="primary"))
+        await session.commit()
+
+    note = await SQLAlchemyRepository(Note).get_single(id=1, primary=True)
+
+    assert note.text == "primary"
+    assert broken_replica.choose() is not None
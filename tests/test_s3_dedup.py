@@ -0,0 +1,58 @@
+from botocore.exceptions import ClientError
+
+from app.integrations.aws.dedup import S3ObjectIndex
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class FakeS3Client:
+    def __init__(self, error_code=None):
+        self.error_code = error_code
+        self.heads = 0
+
+    async def head_object(self, Bucket, Key):
+        self.heads += 1
+        if self.error_code:
+            raise ClientError({"Error": {"Code": self.error_code}}, "HeadObject")
+        return {}
+
+
+async def test_indexed_object_skips_head():
+    index = S3ObjectIndex(FakeRedis(), ttl=60)
+    s3_client = FakeS3Client()
+    await index.add("bucket", "hash.png")
+
+    assert await index.exists(s3_client, "bucket", "hash.png")
+    assert s3_client.heads == 0
+
+
+async def test_head_hit_is_indexed():
+    redis = FakeRedis()
+    index = S3ObjectIndex(redis, ttl=60)
+
+    assert await index.exists(FakeS3Client(), "bucket", "hash.png")
+    assert S3ObjectIndex.key("bucket", "hash.png") in redis.data
+
+
+async def test_missing_object_is_a_miss():
+    index = S3ObjectIndex(FakeRedis(), ttl=60)
+
+    assert not await index.exists(FakeS3Client(error_code="404"), "bucket", "hash.png")
+
+
+async def test_forbidden_head_is_a_miss():
+    index = S3ObjectIndex(FakeRedis(), ttl=60)
+
+    assert not await index.exists(FakeS3Client(error_code="403"), "bucket", "hash.png")
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import sentry
+from app.core.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def sampling_settings(monkeypatch):
+    monkeypatch.setattr(settings, "sentry_traces_sample_rate", 0.2)
+    monkeypatch.setattr(settings, "sentry_route_sample_rates", {"/api/v1": 0.5, "/api/v1/orders": 1.0})
+    monkeypatch.setattr(settings, "sentry_ignored_routes", ["/metrics", "/health"])
+    monkeypatch.setattr(settings, "sentry_slow_request_ms", 1000)
+    monkeypatch.setattr(settings, "sentry_fast_transaction_keep_rate", 0.0)
+
+
+@pytest.mark.parametrize("path, rate", [
+    ("/api/v1/orders/42", 1.0),
+    ("/api/v1/users", 0.5),
+    ("/docs", 0.2),
+    ("/metrics", 0.0),
+    ("/health/ready", 0.0),
+    ("/healthcheck", 0.2),
+])
+def test_route_sample_rate_uses_the_longest_prefix(path, rate):
+    assert sentry.route_sample_rate(path) == rate
+
+
+def test_traces_sampler_follows_the_parent_decision():
+    assert sentry.traces_sampler({"parent_sampled": True, "asgi_scope": {"path": "/metrics"}}) == 1.0
+    assert sentry.traces_sampler({"asgi_scope": {"path": "/api/v1/users"}}) == 0.5
+
+
+def transaction(duration_ms: float, status: str = "ok") -> dict:
+    start = datetime(2024, 1, 1)
+    return {
+        "start_timestamp": start,
+        "timestamp": start + timedelta(milliseconds=duration_ms),
+        "contexts": {"trace": {"status": status}},
+    }
+
+
+def test_errored_and_slow_transactions_are_kept():
+    assert sentry.before_send_transaction(transaction(10, status="internal_error"), {}) is not None
+    assert sentry.before_send_transaction(transaction(1500), {}) is not None
+
+
+def test_fast_transactions_are_dropped_beyond_the_keep_rate():
+    assert sentry.before_send_transaction(transaction(10), {}) is None
@@ -0,0 +1,86 @@
+import hashlib
+from datetime import timedelta
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core import cache
+from app.users.auth.tokens import TokenService
+
+SECRET = "test-secret-key-with-enough-length"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def to_pem(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+@pytest.mark.parametrize("algorithm, private_key", [
+    ("ES256", ec.generate_private_key(ec.SECP256R1())),
+    ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+])
+def test_asymmetric_sign_and_verify(algorithm, private_key):
+    private_pem, public_pem = to_pem(private_key)
+    signer = TokenService(algorithm, private_key=private_pem)
+    verifier = TokenService(algorithm, public_key=public_pem)
+
+    token = signer.encode({"sub": "1"}, "access_token", timedelta(minutes=5))
+
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    assert verifier.decode(token)["sub"] == "1"
+    assert signer.decode(token)["mode"] == "access_token"
+
+
+def test_public_key_only_service_cannot_encode():
+    _, public_pem = to_pem(ec.generate_private_key(ec.SECP256R1()))
+    verifier = TokenService("ES256", public_key=public_pem)
+
+    with pytest.raises(RuntimeError):
+        verifier.encode({"sub": "1"}, "access_token", timedelta(minutes=5))
+
+
+def test_verified_cache_never_outlives_the_token(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    service = TokenService("HS256", secret=SECRET, cache_ttl=60)
+    token = service.encode({"sub": "1"}, "access_token", timedelta(seconds=5))
+    key = hashlib.sha256(token.encode()).digest()
+
+    service.decode(token)
+    clock.now += 4
+    assert service.verified.get(key) is not None
+    clock.now += 2
+    assert service.verified.get(key) is None
+
+
+def test_decode_returns_a_copy_of_the_cached_payload():
+    service = TokenService("HS256", secret=SECRET)
+    token = service.encode({"sub": "1"}, "access_token", timedelta(minutes=5))
+
+    service.decode(token)["sub"] = "2"
+
+    assert service.decode(token)["sub"] == "1"
+
+
+def test_encode_does_not_modify_the_data():
+    service = TokenService("HS256", secret=SECRET)
+    data = {"sub": "1"}
+
+    service.encode(data, "access_token", timedelta(minutes=5))
+
+    assert data == {"sub": "1"}
@@ -0,0 +1,75 @@
+import httpx
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from sqlalchemy import String, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.core.middleware import UnitOfWorkMiddleware
+from app.database import unit_of_work
+from app.database.repositories import SQLAlchemyRepository
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Note(Base):
+    __tablename__ = "notes"  # noqa
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    text: Mapped[str] = mapped_column(String)
+
+
+@pytest.fixture(autouse=True)
+async def tables(engine):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+def build_app() -> FastAPI:
+    repository = SQLAlchemyRepository(Note)
+    app = FastAPI()
+
+    @app.post("/notes")
+    async def create_note(background_tasks: BackgroundTasks):
+        await repository.create({"text": "request"})
+        background_tasks.add_task(repository.create, {"text": "background"})
+        return {"status": "ok"}
+
+    app.add_middleware(UnitOfWorkMiddleware)
+    return app
+
+
+async def count_notes(session_factory, text: str) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(Note).where(Note.text == text))
+
+
+async def test_background_task_writes_are_committed(session_factory):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/notes")
+
+    assert response.status_code == 200
+    assert await count_notes(session_factory, "request") == 1
+    assert await count_notes(session_factory, "background") == 1
+
+
+async def test_closed_unit_of_work_is_not_current(session_factory):
+    async with unit_of_work.unit_of_work() as uow:
+        assert unit_of_work.get_unit_of_work() is uow
+        await uow.close()
+        assert unit_of_work.get_unit_of_work() is None
+
+
+async def test_failed_write_keeps_earlier_writes_of_the_unit_of_work(session_factory):
+    repository = SQLAlchemyRepository(Note)
+    async with unit_of_work.unit_of_work():
+        first = await repository.create({"text": "a"})
+        with pytest.raises(IntegrityError):
+            await repository.update({"text": None}, id=first.id)
+        await repository.create({"text": "b"})
+
+    assert await count_notes(session_factory, "a") == 1
+    assert await count_notes(session_factory, "b") == 1